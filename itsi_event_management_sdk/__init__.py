@@ -1,14 +1,28 @@
-from .eventing import EventMeta, Event, EventGroup
-from .eventing_base import Client
+from .eventing import EventMeta, Event, EventGroup, EventBatch
+from .eventing_base import Client, RateLimiter, TokenBucket, RetryPolicy
+from .eventing_base import CircuitBreaker, CircuitOpenError, AdaptiveConcurrencyLimit
+from .eventing_base import EventCache
 from .custom_event_action_base import CustomEventActionBase
+from .async_eventing import AsyncEventMeta, AsyncEvent, AsyncEventGroup, gather
 
 __all__ = [
     'EventMeta',
     'Event',
     'EventGroup',
+    'EventBatch',
     'Client',
-    'CustomEventActionBase'
+    'RateLimiter',
+    'TokenBucket',
+    'RetryPolicy',
+    'CircuitBreaker',
+    'CircuitOpenError',
+    'AdaptiveConcurrencyLimit',
+    'EventCache',
+    'CustomEventActionBase',
+    'AsyncEventMeta',
+    'AsyncEvent',
+    'AsyncEventGroup',
+    'gather'
 ]
 
 __version__ = '1.0.0'
-
@@ -0,0 +1,215 @@
+# Copyright (C) 2005-2018 Splunk Inc. All Rights Reserved
+
+"""
+Asynchronous counterparts of the classes in the `eventing` module.
+
+`AsyncEventMeta`, `AsyncEvent` and `AsyncEventGroup` expose the same methods,
+with the same arguments, validation and return values as `EventMeta`, `Event`
+and `EventGroup`. The difference is that a call does not wait on splunkd.
+It is handed to a pool of worker threads and returns right away with a
+pending result. Call `get()` on it, or pass many of them to `gather()`, to
+collect the outcome. This way many requests are in flight at once.
+
+Usage:
+>>> events = AsyncEvent(username, password, base_url, max_workers=16)
+>>> pending = [events.create_tag(i, 'remedy') for i in event_ids]
+>>> tags = gather(pending)
+>>> events.close()
+"""
+
+from multiprocessing.pool import ThreadPool
+
+from eventing import EventMeta, Event, EventGroup, default_logger
+
+DEFAULT_MAX_WORKERS = 8
+
+
+def gather(pending, timeout=None, return_exceptions=False):
+    """
+    wait for a bunch of pending results and return their values
+
+    @type pending: list
+    @param pending: pending results returned by any of the Async* classes
+
+    @type timeout: float
+    @param timeout: (optional) seconds to wait on each pending result
+
+    @type return_exceptions: boolean
+    @param return_exceptions: (optional) When ``True``, an exception raised by
+        a call is returned in its place instead of being raised.
+
+    @rtype: list
+    @return: values in the same order as `pending`
+    """
+    rval = []
+    for result in pending:
+        try:
+            rval.append(result.get(timeout))
+        except Exception as exc:
+            if not return_exceptions:
+                raise
+            rval.append(exc)
+    return rval
+
+
+def _async_method(client_class, name):
+    """
+    build a method that runs `name` of the wrapped blocking client on the
+    worker pool and returns the pending result
+    """
+    def method(self, *args, **kwargs):
+        return self._submit(name, args, kwargs)
+    method.__name__ = name
+    method.__doc__ = ('Asynchronous `{0}.{1}`. Returns a pending result; call'
+            ' `get()` on it for the value.\n{2}').format(client_class.__name__,
+            name, getattr(client_class, name).__doc__ or '')
+    return method
+
+
+class _AsyncClient(object):
+    """
+    Runs the methods of a blocking client on a pool of worker threads.
+    """
+    def __init__(self, client, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        @type client: object
+        @param client: blocking client that does the actual work, or a
+            pending result that resolves to one
+
+        @type max_workers: int
+        @param max_workers: (optional) most requests in flight at once
+        """
+        if not isinstance(max_workers, int) or max_workers < 1:
+            raise ValueError(('Expecting `max_workers` to be a positive int.'
+                    ' Received: %s')%max_workers)
+        self.max_workers = max_workers
+        self._pool = ThreadPool(max_workers)
+        self._client = client
+
+    @property
+    def client(self):
+        """
+        @return: the blocking client that does the actual work
+        """
+        return self._client
+
+    def _call(self, name, args, kwargs):
+        return getattr(self.client, name)(*args, **kwargs)
+
+    def _submit(self, name, args, kwargs):
+        return self._pool.apply_async(self._call, (name, args, kwargs))
+
+    def close(self):
+        """
+        wait for pending calls to finish and shut the worker pool down
+        """
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class AsyncEventMeta(_AsyncClient):
+    """
+    Asynchronous `EventMeta`. Fetching the configuration does not block the
+    constructor; the getters return pending results.
+
+    Usage:
+    >>> meta = AsyncEventMeta(username, password, base_url)
+    >>> statuses = meta.get_all_statuses().get()
+    """
+    def __init__(self, username, password, base_url, logger=default_logger, session=None,
+                 silent=False, delay=0.0, max_workers=DEFAULT_MAX_WORKERS, **kwargs):
+        """
+        Same parameters as `EventMeta`, plus:
+
+        @type max_workers: int
+        @param max_workers: (optional) most requests in flight at once
+        """
+        kwargs.setdefault('pool_maxsize', max_workers)
+        super(AsyncEventMeta, self).__init__(None, max_workers)
+        self._client = self._pool.apply_async(EventMeta, (username, password,
+                base_url, logger, session, silent, delay), kwargs)
+
+    @property
+    def client(self):
+        return self._client.get()
+
+    get_all_statuses = _async_method(EventMeta, 'get_all_statuses')
+    get_all_severities = _async_method(EventMeta, 'get_all_severities')
+    get_all_owners = _async_method(EventMeta, 'get_all_owners')
+
+
+class AsyncEvent(_AsyncClient):
+    """
+    Asynchronous `Event`.
+    """
+    def __init__(self, username, password, base_url, logger=default_logger, session=None,
+                 silent=False, delay=0.0, max_workers=DEFAULT_MAX_WORKERS, **kwargs):
+        """
+        Same parameters as `Event`, plus:
+
+        @type max_workers: int
+        @param max_workers: (optional) most requests in flight at once
+        """
+        kwargs.setdefault('pool_maxsize', max_workers)
+        super(AsyncEvent, self).__init__(Event(username, password, base_url,
+                logger, session, silent, delay, **kwargs), max_workers)
+
+    get_severity = _async_method(Event, 'get_severity')
+    get_status = _async_method(Event, 'get_status')
+    get_owner = _async_method(Event, 'get_owner')
+    get_fields = _async_method(Event, 'get_fields')
+    update = _async_method(Event, 'update')
+    update_severity = _async_method(Event, 'update_severity')
+    update_status = _async_method(Event, 'update_status')
+    update_owner = _async_method(Event, 'update_owner')
+    create_tag = _async_method(Event, 'create_tag')
+    update_tag = _async_method(Event, 'update_tag')
+    get_all_tags = _async_method(Event, 'get_all_tags')
+    get_tags_for_events = _async_method(Event, 'get_tags_for_events')
+    get_tag = _async_method(Event, 'get_tag')
+    delete_tag = _async_method(Event, 'delete_tag')
+    delete_all_tags = _async_method(Event, 'delete_all_tags')
+    delete_all_tags_for_events = _async_method(Event, 'delete_all_tags_for_events')
+    create_tags = _async_method(Event, 'create_tags')
+    delete_tags = _async_method(Event, 'delete_tags')
+    set_tags = _async_method(Event, 'set_tags')
+    create_comment = _async_method(Event, 'create_comment')
+    create_comments = _async_method(Event, 'create_comments')
+    get_comment = _async_method(Event, 'get_comment')
+    get_all_comments = _async_method(Event, 'get_all_comments')
+    get_comments_for_events = _async_method(Event, 'get_comments_for_events')
+    delete_comment = _async_method(Event, 'delete_comment')
+    delete_all_comments = _async_method(Event, 'delete_all_comments')
+    delete_all_comments_for_events = _async_method(Event,
+            'delete_all_comments_for_events')
+    update_comment = _async_method(Event, 'update_comment')
+    update_ticket_info = _async_method(Event, 'update_ticket_info')
+    delete_ticket_info = _async_method(Event, 'delete_ticket_info')
+
+
+class AsyncEventGroup(_AsyncClient):
+    """
+    Asynchronous `EventGroup`.
+    """
+    def __init__(self, username, password, base_url, logger=default_logger, session=None,
+                 silent=False, delay=0.0, max_workers=DEFAULT_MAX_WORKERS, **kwargs):
+        """
+        Same parameters as `EventGroup`, plus:
+
+        @type max_workers: int
+        @param max_workers: (optional) most requests in flight at once
+        """
+        kwargs.setdefault('pool_maxsize', max_workers)
+        super(AsyncEventGroup, self).__init__(EventGroup(username, password,
+                base_url, logger, session, silent, delay, **kwargs), max_workers)
+
+    get = _async_method(EventGroup, 'get')
+    add_drilldown = _async_method(EventGroup, 'add_drilldown')
+    update_drilldown = _async_method(EventGroup, 'update_drilldown')
+    delete_drilldown = _async_method(EventGroup, 'delete_drilldown')
@@ -5,15 +5,37 @@ Import this module when you'd like to consume output of your modalert
 All the details are abstracted nicely for you.
 """
 
+import io
 import os
 import csv
 import json
 import gzip
+import time
+import Queue
+import threading
+from operator import itemgetter
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
+from collections import deque, namedtuple, OrderedDict
 
 from eventing_base import setup_logger
 
 default_logger = setup_logger()
 
+def _call_handler(args):
+    """
+    run a handler of `CustomEventActionBase.run()` on one item. Lives at
+    module level so that process pools can pickle it.
+
+    @rtype: tuple
+    @return: (index, result, error). One of result and error is None.
+    """
+    handler, index, item = args
+    try:
+        return index, handler(item), None
+    except Exception as exc:
+        return index, None, '%s: %s' % (type(exc).__name__, exc)
+
 class CustomEventActionBase(object):
     """
     In your script, inherit your class from this class.
@@ -30,6 +52,15 @@ class CustomEventActionBase(object):
         >>>         event_data = self.get_event()
         >>>         # implement your logic here...not implemented in baseclass.
     """
+    # rows handed over per batch and most batches queued up by the reader
+    # thread when reading in the background
+    READ_BATCH_SIZE = 1000
+    READ_QUEUE_SIZE = 4
+
+    # rows per batch yielded by `get_event_batches`; matches the chunks
+    # `Event.update*` sends
+    EVENT_BATCH_SIZE = 500
+
     def __init__(self, settings, logger=default_logger):
         """
         Initialize with incoming parameters which were passed to your script
@@ -81,13 +112,26 @@ class CustomEventActionBase(object):
             raise KeyError('No results_file found in settings')
         return self.settings['results_file']
 
-    def get_event(self):
+    def get_event(self, background=False, batch_size=None, queue_size=None):
         """
         Get events which triggered our custom action.
         Assumes that output of `sendalert` is always a .csv.gz
         Implemented as a generator because we could potentially be working on
         thousands of events.
 
+        @type background: boolean
+        @param background: (optional) When ``True``, a background thread
+            inflates and parses the file while you work on earlier events.
+            See `_read_in_background`.
+
+        @type batch_size: int
+        @param batch_size: (optional) rows per batch handed over by the
+            background thread. Defaults to `READ_BATCH_SIZE`.
+
+        @type queue_size: int
+        @param queue_size: (optional) most batches read ahead. Defaults to
+            `READ_QUEUE_SIZE`.
+
         @rtype: dict
         @returns: yields a dict type object till all received events are
         returned.
@@ -103,11 +147,305 @@ class CustomEventActionBase(object):
             self.logger.debug('File=`%s` does not exist.', file_path)
             yield IOError('File=`%s` does not exist.' % file_path)
 
-        with gzip.open(file_path, 'r') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
+        rows = self._iter_dicts(self._open_results_file(file_path))
+        if background:
+            rows = self._read_in_background(rows, batch_size, queue_size)
+        try:
+            for row in rows:
+                yield row
+        finally:
+            rows.close()
+
+    def _iter_dicts(self, f):
+        with f:
+            for row in csv.DictReader(f):
                 yield row
 
+    def _read_in_background(self, rows, batch_size=None, queue_size=None):
+        """
+        run the `rows` generator on a background thread. It hands rows over
+        in batches through a bounded queue; once the queue is full it waits
+        for the caller to catch up, which caps memory use. Inflating, parsing
+        and the caller's processing thereby overlap. Pays off when the caller
+        waits on I/O, such as requests to splunkd; pure Python work on rows
+        does not overlap with parsing because of the GIL.
+
+        @type rows: generator
+        @param rows: rows to read
+
+        @rtype: generator
+        @return: yields the rows of `rows`, in order. An error raised while
+            reading is raised here.
+        """
+        if batch_size is None:
+            batch_size = self.READ_BATCH_SIZE
+        if queue_size is None:
+            queue_size = self.READ_QUEUE_SIZE
+        for name, value in (('batch_size', batch_size), ('queue_size', queue_size)):
+            if not isinstance(value, int) or value < 1:
+                raise ValueError('Expecting `%s` to be a positive int. Received: %s'
+                        % (name, value))
+        return self._consume(rows, batch_size, Queue.Queue(queue_size))
+
+    def _consume(self, rows, batch_size, queue):
+        stop = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    queue.put(item, timeout=0.1)
+                    return True
+                except Queue.Full:
+                    pass
+            return False
+
+        def read():
+            try:
+                batch = []
+                for row in rows:
+                    batch.append(row)
+                    if len(batch) >= batch_size:
+                        if not put((batch, None)):
+                            return
+                        batch = []
+                if batch and not put((batch, None)):
+                    return
+                put((None, None))
+            except Exception as exc:
+                self.logger.exception('Unable to read results file.')
+                put((None, exc))
+            finally:
+                rows.close()
+
+        reader = threading.Thread(target=read, name='results-file-reader')
+        reader.daemon = True
+        reader.start()
+        try:
+            while True:
+                batch, exc = queue.get()
+                if exc is not None:
+                    raise exc
+                if batch is None:
+                    return
+                for row in batch:
+                    yield row
+        finally:
+            stop.set()
+            reader.join()
+
+    def _open_results_file(self, file_path=None):
+        """
+        open the gzipped results file for reading. Reads through a buffer,
+        as line by line reads straight off a gzip file are slow.
+
+        @rtype: file like object
+        @raises ValueError: on an empty path
+        @raises IOError: if there is no such file
+        """
+        if file_path is None:
+            file_path = self.get_results_file()
+        if not file_path:
+            raise ValueError('Expecting a valid file path. Received=`%s`'%file_path)
+        if not os.path.exists(file_path):
+            raise IOError('File=`%s` does not exist.' % file_path)
+        return io.BufferedReader(gzip.open(file_path, 'rb'))
+
+    def _project(self, header, columns):
+        """
+        @type header: list
+        @param header: column names of the results file
+
+        @type columns: list
+        @param columns: column names wanted, each at most once; None for all
+
+        @rtype: tuple
+        @return: (column names, function that takes a csv row and returns a
+            tuple of the wanted values)
+        """
+        if columns is None:
+            columns = header
+        else:
+            if isinstance(columns, basestring):
+                columns = [columns]
+            if not columns:
+                raise ValueError('Expecting at least one column. Received: %s'
+                        % columns)
+            duplicates = sorted(set(i for i in columns if columns.count(i) > 1))
+            if duplicates:
+                raise ValueError('Columns %s requested more than once.'
+                        % duplicates)
+        missing = [i for i in columns if i not in header]
+        if missing:
+            raise KeyError('Columns %s not in results file. Available: %s'
+                    % (missing, header))
+        width = len(header)
+        getter = itemgetter(*[header.index(i) for i in columns])
+        single = len(columns) == 1
+
+        def project(row):
+            if len(row) < width:
+                row = row + [''] * (width - len(row))
+            values = getter(row)
+            return (values,) if single else values
+        return list(columns), project
+
+    def get_rows(self, columns=None, row_type='namedtuple', background=False,
+            batch_size=None, queue_size=None):
+        """
+        A leaner `get_event()` for large results files. Only the requested
+        columns are kept and rows are tuples that share one header, instead
+        of a dict per row.
+
+        Usage::
+            >>> for row in self.get_rows(['event_id', 'severity']):
+            >>>     print row.event_id, row.severity
+
+        @type columns: list/basestring
+        @param columns: (optional) columns to keep, in the order wanted.
+            Defaults to all columns of the results file.
+
+        @type row_type: basestring
+        @param row_type: (optional) `namedtuple` or `tuple`. Column names that
+            are not valid identifiers, like `_time`, are renamed to their
+            position in a namedtuple; see `Row._fields`.
+
+        @type background: boolean
+        @param background: (optional) read and parse on a background thread.
+            `batch_size` and `queue_size` as for `get_event()`.
+
+        @rtype: generator
+        @return: yields one row at a time
+        @raises KeyError: if a requested column is not in the results file
+        """
+        if row_type not in ('namedtuple', 'tuple'):
+            raise ValueError(('Expecting `row_type` to be `namedtuple` or'
+                    ' `tuple`. Received: %s')%row_type)
+        rows = self._iter_rows(self._open_results_file(), columns, row_type)
+        if background:
+            rows = self._read_in_background(rows, batch_size, queue_size)
+        return rows
+
+    def _iter_rows(self, f, columns, row_type):
+        with f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            columns, project = self._project(header, columns)
+            if row_type == 'tuple':
+                for row in reader:
+                    yield project(row)
+                return
+            make = namedtuple('Row', columns, rename=True)._make
+            for row in reader:
+                yield make(project(row))
+
+    def get_columns(self, columns=None):
+        """
+        read the results file in one go into an array per column. Handy for
+        bulk calls, ex: `event.update_status(cols['event_id'], '5')`
+
+        @type columns: list/basestring
+        @param columns: (optional) columns to read. Defaults to all.
+
+        @rtype: OrderedDict
+        @return: {column: list of values}, in the order of `columns`
+        @raises KeyError: if a requested column is not in the results file
+        """
+        with self._open_results_file() as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return OrderedDict()
+            columns, project = self._project(header, columns)
+            arrays = [[] for _ in columns]
+            appends = [i.append for i in arrays]
+            for row in reader:
+                for append, value in zip(appends, project(row)):
+                    append(value)
+        return OrderedDict(zip(columns, arrays))
+
+    def get_event_batches(self, size=None, max_bytes=None, event_ids_only=False,
+            dedupe_window=None, background=False):
+        """
+        Like `get_event()`, but yields lists of events, ready to be fed to
+        the bulk methods of `Event`.
+
+        Usage::
+            >>> for event_ids in self.get_event_batches(500, event_ids_only=True,
+            >>>         dedupe_window=10000):
+            >>>     event.update_status(event_ids, '5')
+
+        @type size: int
+        @param size: (optional) most rows per batch. Defaults to
+            `EVENT_BATCH_SIZE`.
+
+        @type max_bytes: int
+        @param max_bytes: (optional) most bytes of field names and values per
+            batch. A row larger than this gets a batch of its own.
+
+        @type event_ids_only: boolean
+        @param event_ids_only: (optional) When ``True``, batches hold event
+            ids instead of rows, and only the `event_id` column is parsed.
+
+        @type dedupe_window: int
+        @param dedupe_window: (optional) drop rows whose event id was seen
+            among the last these many distinct event ids. Memory stays
+            bounded by the window, not by the file.
+
+        @type background: boolean
+        @param background: (optional) read on a background thread; see
+            `get_event()`.
+
+        @rtype: generator
+        @return: yields lists of dicts, or of event ids
+        """
+        if size is None:
+            size = self.EVENT_BATCH_SIZE
+        for name, value in (('size', size), ('max_bytes', max_bytes),
+                ('dedupe_window', dedupe_window)):
+            if value is not None and (not isinstance(value, int) or value < 1):
+                raise ValueError('Expecting `%s` to be a positive int. Received: %s'
+                        % (name, value))
+
+        if event_ids_only:
+            rows = (i[0] for i in self.get_rows('event_id', row_type='tuple',
+                    background=background) if i[0])
+            get_id = lambda row: row
+            get_size = len
+        else:
+            rows = self.get_event(background=background)
+            get_id = lambda row: row.get('event_id')
+            get_size = lambda row: sum(len(k or '') + len(v or '')
+                    for k, v in row.iteritems() if isinstance(v, basestring))
+        return self._batch_rows(rows, size, max_bytes, dedupe_window, get_id,
+                get_size)
+
+    def _batch_rows(self, rows, size, max_bytes, dedupe_window, get_id, get_size):
+        seen = OrderedDict()
+        batch, batch_bytes, dropped = [], 0, 0
+        for row in rows:
+            if dedupe_window is not None:
+                event_id = get_id(row)
+                if event_id in seen:
+                    dropped += 1
+                    continue
+                if event_id:
+                    seen[event_id] = None
+                    if len(seen) > dedupe_window:
+                        seen.popitem(last=False)
+            row_bytes = get_size(row) if max_bytes is not None else 0
+            if batch and (len(batch) >= size or
+                    (max_bytes is not None and batch_bytes + row_bytes > max_bytes)):
+                yield batch
+                batch, batch_bytes = [], 0
+            batch.append(row)
+            batch_bytes += row_bytes
+        if batch:
+            yield batch
+        if dropped:
+            self.logger.info('Dropped %s rows with a recently seen event id.', dropped)
+
     def extract_event_id(self, notable_data):
         """
         given notable_data extract event_id
@@ -132,6 +470,151 @@ class CustomEventActionBase(object):
                 raise Exception(msg)
         return notable_data.get('event_id')
 
+    def run(self, handler, batch_size=None, max_workers=8, pool='thread',
+            ordered=True, event_ids_only=False, dedupe_window=None, background=False):
+        """
+        call `handler` on every event, or every batch of events, in the
+        results file on a pool of workers. Meant to be called from
+        `execute()`. Errors raised by `handler` are captured per item, so one
+        bad event does not stop the rest.
+
+        Usage::
+            >>> def execute(self):
+            >>>     summary = self.run(self.handle_event, max_workers=16)
+            >>>     self.logger.info('Failed: %s', summary['failed'])
+
+        @type handler: callable
+        @param handler: takes an event, or a list of them if `batch_size` is
+            set. With a process pool it must be picklable, i.e. a module
+            level function.
+
+        @type batch_size: int
+        @param batch_size: (optional) hand events over in lists of up to
+            these many. See `get_event_batches()`.
+
+        @type max_workers: int
+        @param max_workers: (optional) workers in the pool. 1 runs `handler`
+            serially in this thread, a baseline for throughput comparisons.
+
+        @type pool: basestring
+        @param pool: (optional) `thread` or `process`. Threads suit handlers
+            that wait on splunkd or other services; processes suit CPU bound
+            handlers.
+
+        @type ordered: boolean
+        @param ordered: (optional) When ``True``, items are collected in the
+            order of the results file. Else in the order they complete, which
+            keeps workers busy when some items are slow. Either way `results`
+            is indexed by item.
+
+        @type event_ids_only: boolean
+        @param event_ids_only: (optional) hand over event ids instead of rows
+
+        @type dedupe_window: int
+        @param dedupe_window: (optional) see `get_event_batches()`
+
+        @type background: boolean
+        @param background: (optional) read on a background thread; see
+            `get_event()`
+
+        @rtype: dict
+        @return: summary of the run.
+            {
+                'items': <items handled>,
+                'succeeded': <items handled without error>,
+                'failed': {<item index>: 'error', ...},
+                'results': [<return value of handler, None on error>, ...],
+                    one per item, in the order of the results file, so
+                    `results[i]` belongs to the same item as `failed[i]`
+                'elapsed': <seconds>,
+                'rate': <items per second>
+            }
+        """
+        if not callable(handler):
+            raise TypeError('Expecting `handler` to be callable. Received: %s'
+                    % type(handler).__name__)
+        if not isinstance(max_workers, int) or max_workers < 1:
+            raise ValueError('Expecting `max_workers` to be a positive int. Received: %s'
+                    % max_workers)
+        if pool not in ('thread', 'process'):
+            raise ValueError('Expecting `pool` to be `thread` or `process`. Received: %s'
+                    % pool)
+
+        batches = self.get_event_batches(batch_size or 1, None, event_ids_only,
+                dedupe_window, background)
+        items = batches if batch_size else (i[0] for i in batches)
+        tasks = ((handler, index, item) for index, item in enumerate(items))
+
+        started = time.time()
+        if max_workers == 1:
+            outcomes = (_call_handler(i) for i in tasks)
+            workers = None
+        else:
+            workers = ThreadPool(max_workers) if pool == 'thread' else Pool(max_workers)
+            outcomes = self._run_on_pool(workers, tasks, max_workers * 2, ordered)
+
+        rval = {'items': 0, 'succeeded': 0, 'failed': {}}
+        results = {}
+        try:
+            for index, result, error in outcomes:
+                rval['items'] += 1
+                results[index] = result
+                if error is None:
+                    rval['succeeded'] += 1
+                else:
+                    rval['failed'][index] = error
+        finally:
+            if workers is not None:
+                workers.close()
+                workers.join()
+        rval['results'] = [results.get(i) for i in xrange(rval['items'])]
+        rval['elapsed'] = time.time() - started
+        rval['rate'] = rval['items'] / rval['elapsed'] if rval['elapsed'] else 0.0
+
+        log = self.logger.error if rval['failed'] else self.logger.info
+        log('Handled %s items, %s failed, in %.2fs (%.1f/s) with %s %s worker(s).',
+                rval['items'], len(rval['failed']), rval['elapsed'], rval['rate'],
+                max_workers, pool if workers is not None else 'serial')
+        return rval
+
+    def _run_on_pool(self, workers, tasks, window, ordered):
+        """
+        submit `tasks` to `workers`, keeping at most `window` of them in
+        flight so a large results file is never queued up whole
+
+        @rtype: generator
+        @return: yields (index, result, error) of each task
+        """
+        def get(pending):
+            task, async_result = pending
+            try:
+                return async_result.get()
+            except Exception as exc:
+                # ex: the item or handler could not be pickled
+                return task[1], None, '%s: %s' % (type(exc).__name__, exc)
+
+        pending = deque()
+        for task in tasks:
+            pending.append((task, workers.apply_async(_call_handler, (task,))))
+            while len(pending) >= window:
+                if ordered:
+                    yield get(pending.popleft())
+                    continue
+                ready = [i for i in pending if i[1].ready()]
+                if not ready:
+                    pending[0][1].wait(0.01)
+                for i in ready:
+                    pending.remove(i)
+                    yield get(i)
+        while pending:
+            if ordered:
+                yield get(pending.popleft())
+                continue
+            ready = [i for i in pending if i[1].ready()] or [pending[0]]
+            for i in ready:
+                pending.remove(i)
+                yield get(i)
+
     def execute(self):
         """
         Not Implemented. Derived class must implement this method. This is
@@ -144,5 +627,6 @@ class CustomEventActionBase(object):
         - update the severity of the event
         - update the status of the event
         ...and so on.
+        Use `run()` to work on the events of the results file in parallel.
         """
         raise NotImplementedError('Derived class must implemented `execute`.')
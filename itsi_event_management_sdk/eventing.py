@@ -9,10 +9,14 @@ consuming standard REST interfaces and then it should be OK to move this module
 to a different host.
 """
 
+import os
 import sys
 import json
 import time
-from copy import deepcopy
+import urllib
+import threading
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
 
 from eventing_base import Client, setup_logger
 
@@ -32,7 +36,7 @@ class EventMeta(Client):
     Provide your own logger if you want to, else we'll default to default_logger
     """
     def __init__(self, username, password, base_url, logger=default_logger, session=None,
-                 silent=False, delay=0.0):
+                 silent=False, delay=0.0, **kwargs):
 
         """
         @type username: string
@@ -58,9 +62,13 @@ class EventMeta(Client):
         @type delay: float
         @param delay: (option) Ensures a minimum delay of seconds between
             requests.
+
+        @type kwargs: dict
+        @param kwargs: (optional) other `Client` options such as
+            `pool_maxsize`. See `Client.__init__`.
         """
         super(EventMeta, self).__init__(username, password, base_url, logger, session,
-                 silent, delay)
+                 silent, delay, **kwargs)
         self.all_info = self.request('GET',
                 'event_management_interface/notable_event_configuration/all_info')
 
@@ -99,8 +107,26 @@ class Event(Client):
     """
     Import this class to operate on ITSI Events.
     """
+    # bulk updates are split into chunks of at most these many events and
+    # roughly these many bytes of request body
+    CHUNK_SIZE = 500
+    MAX_CHUNK_BYTES = 512 * 1024
+
+    # seconds; how long and how often we poll the index for events that are
+    # yet to be indexed
+    POLL_TIMEOUT = 50.0
+    POLL_INTERVAL = 0.5
+    POLL_MAX_INTERVAL = 5.0
+
+    # bytes; most an `ids` query parameter may take once url encoded. Stays
+    # well within the url length limits of splunkd and common proxies
+    MAX_LOOKUP_BYTES = 4096
+
+    # events fetched per request by `iter_events`
+    PAGE_SIZE = 1000
+
     def __init__(self, username, password, base_url, logger=default_logger, session=None,
-                 silent=False, delay=0.0):
+                 silent=False, delay=0.0, cache=None, **kwargs):
 
         """
         @type username: string
@@ -126,9 +152,219 @@ class Event(Client):
         @type delay: float
         @param delay: (option) Ensures a minimum delay of seconds between
             requests.
+
+        @type cache: EventCache
+        @param cache: (optional) read-through cache of events, keyed by event id.
+            Our own writes update or invalidate its entries.
+
+        @type kwargs: dict
+        @param kwargs: (optional) other `Client` options such as
+            `pool_maxsize`. See `Client.__init__`.
         """
+        self.cache = cache
         super(Event, self).__init__(username, password, base_url, logger, session,
-                                    silent, delay)
+                                    silent, delay, **kwargs)
+
+    def _chunk(self, records, chunk_size=None, max_chunk_bytes=None):
+        """
+        split a list of records into chunks bounded by count and by
+        serialized size. A record bigger than `max_chunk_bytes` gets a chunk
+        of its own.
+
+        @type records: list
+        @param records: JSON serializable records
+
+        @rtype: list
+        @return: list of lists of records
+        """
+        if chunk_size is None:
+            chunk_size = self.CHUNK_SIZE
+        if max_chunk_bytes is None:
+            max_chunk_bytes = self.MAX_CHUNK_BYTES
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError(('Expecting `chunk_size` to be a positive int.'
+                    ' Received: %s')%chunk_size)
+        chunks = []
+        chunk, size = [], 0
+        for record in records:
+            # +2 for the separator between records
+            record_size = len(json.dumps(record)) + 2
+            if chunk and (len(chunk) >= chunk_size or
+                    size + record_size > max_chunk_bytes):
+                chunks.append(chunk)
+                chunk, size = [], 0
+            chunk.append(record)
+            size += record_size
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def _put_chunks(self, chunks, **kwargs):
+        """
+        PUT each chunk of per event updates to `notable_event` concurrently
+
+        @rtype: list
+        @return: list of tuples (response, exception), one per chunk
+        """
+        params = self._time_params(kwargs)
+        def put(chunk):
+            return self._send('PUT', 'event_management_interface/notable_event',
+                    params=params, data=chunk)
+        return self._dispatch(put, chunks)
+
+    def _time_params(self, kwargs):
+        """
+        @rtype: dict
+        @return: `earliest_time` and `latest_time` of `kwargs`, if any. These
+            are the only query params our endpoints take from callers.
+        """
+        return dict((k, v) for k, v in kwargs.items()
+                if k in ('earliest_time', 'latest_time'))
+
+    def _summarize(self, ids, results, action):
+        """
+        turn the outcome of a per id `_dispatch` into a result dict
+
+        @type ids: list
+        @param ids: ids that were dispatched, in order
+
+        @type results: list
+        @param results: what `_dispatch` returned for `ids`
+
+        @type action: basestring
+        @param action: what was done, for the log
+
+        @rtype: dict
+        @return: {'succeeded': [ids], 'failed': {id: error}}
+        """
+        rval = {'succeeded': [], 'failed': {}}
+        for id_, (_, exc) in zip(ids, results):
+            if exc is None:
+                rval['succeeded'].append(id_)
+            else:
+                rval['failed'][id_] = str(exc)
+        if rval['failed']:
+            self.logger.error('Unable to %s for %s of %s ids. Errors: %s', action,
+                    len(rval['failed']), len(ids), rval['failed'])
+        return rval
+
+    def _drop_unchanged(self, data, known_state, **kwargs):
+        """
+        given per event updates, drop those that would not change a thing
+
+        @type data: list
+        @param data: list of dicts, each with an `event_id` and the fields to
+            update on that event
+
+        @type known_state: boolean/list/dict
+        @param known_state: current state of the events. ``True`` fetches it
+            from the index in one go. Else, a list of events such as the rows
+            yielded by `CustomEventActionBase.get_event()`, or a dict of event
+            id to event.
+
+        @type kwargs: dict
+        @param kwargs: `earliest_time` and `latest_time`, used to fetch the
+            state from the index
+
+        @rtype: tuple
+        @return: (updates still to send, event ids skipped)
+        """
+        if known_state is True:
+            # an event not in the index yet has no known state; its update is
+            # sent as is, so there is no point in waiting for it
+            known_state = self._get_from_index([i['event_id'] for i in data],
+                    poll_timeout=0, **self._time_params(kwargs)) or []
+        if isinstance(known_state, dict) and 'event_id' in known_state:
+            known_state = [known_state]
+        if isinstance(known_state, list):
+            known_state = dict((i.get('event_id'), i) for i in known_state
+                    if isinstance(i, dict))
+        if not isinstance(known_state, dict):
+            raise TypeError(('Expecting `known_state` to be True or a list/dict'
+                    ' of events. Received: %s')%type(known_state).__name__)
+
+        kept, skipped = [], []
+        for record in data:
+            current = known_state.get(record['event_id'])
+            if current and all(k in current and unicode(current[k]) == unicode(v)
+                    for k, v in record.items() if k != 'event_id'):
+                skipped.append(record['event_id'])
+            else:
+                kept.append(record)
+        if skipped:
+            self.logger.info('Skipping %s of %s events already up to date.',
+                    len(skipped), len(data))
+        return kept, skipped
+
+    def _update_events(self, data, chunk_size=None, max_chunk_bytes=None,
+            known_state=None, **kwargs):
+        """
+        send per event updates to `notable_event` in concurrent, size bounded
+        chunks
+
+        @type data: list
+        @param data: list of dicts, each with an `event_id` and the fields to
+            update on that event
+
+        @type known_state: boolean/list/dict
+        @param known_state: (optional) when given, updates that match the
+            known state of their event are not sent. See `_drop_unchanged`.
+
+        @type kwargs: dict
+        @param kwargs: time specific params like `earliest_time` and
+            `latest_time` sent with every chunk
+
+        @rtype: dict
+        @return: aggregated result.
+            {
+                'succeeded': ['event_id1', ...],
+                'failed': {'event_id2': 'error', ...},
+                'skipped': ['event_id3', ...],
+                'chunks': [
+                    {
+                        'event_ids': ['event_id1', ...],
+                        'response': <response of splunkd>,
+                        'error': None
+                    },
+                    ...
+                ]
+            }
+        """
+        skipped = []
+        if known_state is not None and known_state is not False:
+            data, skipped = self._drop_unchanged(data, known_state, **kwargs)
+        chunks = self._chunk(data, chunk_size, max_chunk_bytes)
+        rval = {'succeeded': [], 'failed': {}, 'skipped': skipped, 'chunks': []}
+        for chunk, (objects, exc) in zip(chunks, self._put_chunks(chunks, **kwargs)):
+            event_ids = [i['event_id'] for i in chunk]
+            rval['chunks'].append({
+                'event_ids': event_ids,
+                'response': objects,
+                'error': str(exc) if exc is not None else None
+                })
+            self._sync_cache(chunk, exc)
+            if exc is None:
+                rval['succeeded'].extend(event_ids)
+                continue
+            self.logger.error('Unable to update %s events. Error: %s',
+                    len(event_ids), exc)
+            for i in event_ids:
+                rval['failed'][i] = str(exc)
+        return rval
+
+    def _sync_cache(self, chunk, exc):
+        """
+        reflect the outcome of a PUT of `chunk` in `cache`. Written fields
+        are merged into cached events; on failure we cannot tell what made
+        it through, so the events are dropped from the cache.
+        """
+        if self.cache is None:
+            return
+        for i in chunk:
+            if exc is None:
+                self.cache.update(i['event_id'], i)
+            else:
+                self.cache.invalidate(i['event_id'])
 
     def _get_object(self, object_):
         """
@@ -154,7 +390,7 @@ class Event(Client):
     def _extract(self, objects, key):
         """
         given a list of objects, extract requested values given key, dedup
-        and return a list
+        and return a list in the order the values were first seen
         @type objects: dict/list
         @param objects: objects to iterate over and extract id from
         @type key: basestring
@@ -177,10 +413,11 @@ class Event(Client):
         for i in objects:
             if i.get(key):
                 ids_.append(i[key])
-                
-        return list(set(ids_))
 
-    def _get_from_index(self, event_ids, split_by="," , **kwargs):
+        # dedup but keep the order in which we saw them
+        return list(OrderedDict.fromkeys(ids_))
+
+    def _get_from_index(self, event_ids, split_by="," , missing=None, **kwargs):
         """
         given an id or list of ids, return a dictionary of pertinent fields
         for that event. This method runs a Splunk search.
@@ -192,6 +429,10 @@ class Event(Client):
         @param split_by: if event_ids is of type basestring, we will split it
         into many event ids into a list. What is the separator? Defaults to `,`
 
+        @type missing: list
+        @param missing: (optional) ids that could not be found are appended
+        to this list, in the order of `event_ids`
+
         @type kwargs: dict
         @param kwargs: send in keys `earliest_time` and
         `latest_time` with corresponding values if you know what you are doing.
@@ -203,73 +444,282 @@ class Event(Client):
             'rt' implies real time
             'now' implies current time
             no other values are supported
+        Also send in `poll_timeout` to change how many seconds we wait for
+        events that are yet to be indexed. Defaults to `POLL_TIMEOUT`.
 
-        @return a valid Dict if event is found; None if no resource is found
+        Ids are looked up in chunks of at most `MAX_LOOKUP_BYTES`, so as to
+        stay within url length limits. Chunks are fetched concurrently.
+        Events found in `cache` are not looked up again.
+
+        @return a list of events found, in the order of `event_ids`; None if
+        no resource is found. Ids that are still missing are logged and
+        added to `missing`.
         """
         if isinstance(event_ids, basestring):
-            event_ids = event_ids.split(',')
+            event_ids = event_ids.split(split_by)
 
         if not isinstance(event_ids, list):
             raise TypeError('Expecting event_ids to be a string or list')
+        if missing is not None and not isinstance(missing, list):
+            raise TypeError('Expecting `missing` to be a list. Received: %s'
+                    % type(missing).__name__)
+
+        event_ids = list(OrderedDict.fromkeys(event_ids))
+        found = self.cache.get_many(event_ids) if self.cache is not None else {}
+        chunks = self._chunk_ids([i for i in event_ids if i not in found])
+        not_found = []
+        results = self._dispatch(lambda x: self._poll_index(x, **kwargs),
+                chunks)
+        for chunk, (result, exc) in zip(chunks, results):
+            if exc is not None:
+                self.logger.error('Unable to look up %s events. Error: %s',
+                        len(chunk), exc)
+                not_found.extend(chunk)
+                continue
+            for i in result[0]:
+                id_ = i.get('event_id') or i.get('_key')
+                found.setdefault(id_, i)
+                if self.cache is not None:
+                    self.cache.set(id_, i)
+            not_found.extend(result[1])
+        objects = [found[i] for i in event_ids if i in found]
+        if not_found:
+            self.logger.warning('%s of %s events not found in the index: %s',
+                    len(not_found), len(event_ids), not_found)
+            if missing is not None:
+                missing.extend(not_found)
+        return objects or None
+
+    def _chunk_ids(self, event_ids, max_bytes=None):
+        """
+        split event ids into chunks that each fit in an `ids` query parameter
+
+        @type event_ids: list
+        @param event_ids: ids to split
+
+        @type max_bytes: int
+        @param max_bytes: (optional) most bytes of an url encoded chunk.
+            Defaults to `MAX_LOOKUP_BYTES`. An id larger than this gets a
+            chunk of its own.
+
+        @rtype: list
+        @return: list of lists of ids, in the order of `event_ids`
+        """
+        if max_bytes is None:
+            max_bytes = self.MAX_LOOKUP_BYTES
 
+        chunks = []
+        chunk = []
+        size = len(urllib.quote('[]'))
+        for i in event_ids:
+            # each id is json quoted and separated by `, `
+            id_size = len(urllib.quote(json.dumps(i) + ', '))
+            if chunk and size + id_size > max_bytes:
+                chunks.append(chunk)
+                chunk = []
+                size = len(urllib.quote('[]'))
+            chunk.append(i)
+            size += id_size
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def _poll_index(self, event_ids, poll_timeout=None, **kwargs):
+        """
+        fetch events from the index, polling for those that are yet to be
+        indexed. The first attempt is made right away. Later attempts only
+        ask for the ids still missing, backing off from `POLL_INTERVAL` up to
+        `POLL_MAX_INTERVAL` seconds, till all ids are found or `poll_timeout`
+        seconds have passed.
+
+        @type event_ids: list
+        @param event_ids: ids of the events to fetch
+
+        @type poll_timeout: float
+        @param poll_timeout: (optional) defaults to `POLL_TIMEOUT`
+
+        @type kwargs: dict
+        @param kwargs: `earliest_time` and `latest_time`. Others are ignored.
+
+        @rtype: tuple
+        @return: (list of events found in the order of `event_ids`,
+            list of ids still missing)
+        """
         # we only care about `earliest_time` and `latest_time`. get rid of other
         # keys
-        supported_params = ('earliest_time', 'latest_time')
-        for i in kwargs.keys():
-            kwargs.pop(i) if i not in supported_params else None
+        kwargs = self._time_params(kwargs)
+        if poll_timeout is None:
+            poll_timeout = self.POLL_TIMEOUT
 
-        objects = None
+        event_ids = list(OrderedDict.fromkeys(event_ids))
+        found = {}
+        missing = event_ids
+        deadline = time.time() + poll_timeout
+        interval = self.POLL_INTERVAL
 
         # indexing takes time and just because we have an event_id does not
         # really means that event has been indexed
-        retries = 10
-        while retries:
-            time.sleep(5)
+        while True:
             try:
-                params = {'ids':json.dumps(event_ids)}
+                params = {'ids':json.dumps(missing)}
                 params.update(kwargs)
-                objects = self.request('GET', 'event_management_interface/notable_event',
+                objects = self._send('GET', 'event_management_interface/notable_event',
                         params=params)
-                if objects:
-                    break
-                retries -= 1
             except Exception:
                 self.logger.exception('Internal Error.')
                 break
-            
-        return objects
+            objects = self._get_object(objects) or []
+            for i in [objects] if isinstance(objects, dict) else objects:
+                id_ = i.get('event_id') or i.get('_key')
+                if id_ in missing and id_ not in found:
+                    found[id_] = i
+            missing = [i for i in missing if i not in found]
+            if not missing or time.time() + interval > deadline:
+                break
+            time.sleep(interval)
+            interval = min(interval * 2, self.POLL_MAX_INTERVAL)
+
+        return [found[i] for i in event_ids if i in found], missing
+
+    def iter_events(self, filter_data=None, earliest_time=None, latest_time=None,
+            fields=None, sort_key=None, sort_dir=None, page_size=None, limit=None):
+        """
+        page through notable events matching a time range and filter,
+        yielding them one at a time. Only a page or two is held in memory at
+        any point; the next page is fetched in the background while the
+        caller works on the current one.
+
+        Usage:
+        >>> for event in event.iter_events({'status': '1'}, earliest_time='-24h'):
+        >>>     reconcile(event)
+
+        @type filter_data: dict/basestring
+        @param filter_data: (optional) KV store style filter, ex:
+            {'status': '1'} or {'$or': [{'severity': '5'}, {'severity': '6'}]}
+
+        @type earliest_time: basestring
+        @param earliest_time: (optional) ex: '-24h'. See `get_severity`.
+
+        @type latest_time: basestring
+        @param latest_time: (optional) ex: 'now'. See `get_severity`.
+
+        @type fields: basestring/list
+        @param fields: (optional) fields to return, comma separated if a
+            basestring. Defaults to all.
+
+        @type sort_key: basestring
+        @param sort_key: (optional) field to sort by. Paging is only stable
+            when events are sorted.
+
+        @type sort_dir: basestring
+        @param sort_dir: (optional) `asc` or `desc`
+
+        @type page_size: int
+        @param page_size: (optional) events per request. Defaults to
+            `PAGE_SIZE`.
+
+        @type limit: int
+        @param limit: (optional) stop after these many events
+
+        @rtype: generator
+        @return: yields events as dicts
+        """
+        if page_size is None:
+            page_size = self.PAGE_SIZE
+        if not isinstance(page_size, int) or page_size < 1:
+            raise ValueError('Expecting `page_size` to be a positive int. Received: %s'
+                    % page_size)
+        if limit is not None and (not isinstance(limit, int) or limit < 0):
+            raise ValueError('Expecting `limit` to be a non-negative int. Received: %s'
+                    % limit)
+        if filter_data is not None and not isinstance(filter_data, (basestring, dict)):
+            raise TypeError('Expecting `filter_data` to be a dict or string. Received: %s'
+                    % type(filter_data).__name__)
+
+        params = {}
+        if isinstance(filter_data, dict):
+            filter_data = json.dumps(filter_data)
+        if isinstance(fields, list):
+            fields = ','.join(fields)
+        for key, value in (('filter_data', filter_data), ('earliest_time', earliest_time),
+                ('latest_time', latest_time), ('fields', fields),
+                ('sort_key', sort_key), ('sort_dir', sort_dir)):
+            if value is not None:
+                params[key] = value
+        return self._iter_pages(params, page_size, limit)
+
+    def _iter_pages(self, params, page_size, limit):
+        """
+        generator behind `iter_events`. A single worker thread fetches page
+        `n + 1` while page `n` is being consumed.
+        """
+        def fetch(offset):
+            page = dict(params, count=page_size, offset=offset)
+            objects = self._get_object(self._send('GET',
+                    'event_management_interface/notable_event', params=page))
+            if isinstance(objects, dict):
+                objects = [objects]
+            return objects or []
+
+        if limit == 0:
+            return
+        pool = ThreadPool(1)
+        try:
+            offset, yielded = 0, 0
+            pending = pool.apply_async(fetch, (offset,))
+            while pending is not None:
+                page = pending.get()
+                offset += len(page)
+                last = len(page) < page_size or \
+                        (limit is not None and yielded + len(page) >= limit)
+                pending = None if last else pool.apply_async(fetch, (offset,))
+                for event in page:
+                    yield event
+                    yielded += 1
+                    if yielded == limit:
+                        return
+        finally:
+            pool.close()
+            pool.join()
+
+    def get_fields(self, events=None, event_ids=None, fields=None, split_by=",",
+            missing=None, **kwargs):
+        """
+        given a list of events or event ids, return the requested fields of
+        each one. Event ids are looked up in the index with a single search,
+        no matter how many fields are asked for.
 
-    def get_severity(self, events=None, event_ids=None, split_by=",", **kwargs):
-        """
-        given a list of event ids, return their severities
         @type events: list of dicts
         @param events: each dict in the list represents an event that was sent
             to us by Splunk as an outcome of a Custom Action. the get_event()
             method in class CustomEventActionBase generates such an item.
         High performant.
 
-        @type event_ids: str or list
-        @param event_ids: a unique id of an event or list of event ids of events
+        @type event_ids: basestring/list
+        @param event_ids: a unique id for an event or a list of them
         Less performant.
 
+        @type fields: basestring/list
+        @param fields: field names to return, ex: ['severity', 'status', 'owner'].
+            Split by `split_by` if a basestring.
+
         @type split_by: str
-        @param split_by: if `event_ids` is of type basestring, we will split it
-        into many event ids;into a list. What is the separator? Defaults to `,`
+        @param split_by: if `event_ids` or `fields` is of type basestring, we
+        will split it into a list. What is the separator? Defaults to `,`
+
+        @type missing: list
+        @param missing: (optional) `event_ids` that could not be found in the
+        index are appended to this list. Unused when `events` is given.
 
         @type kwargs: dict
         @param kwargs: send in keys `earliest_time` and
         `latest_time` with corresponding values if you know what you are doing.
-            Ex:
-            '-15m' implies '15 mins ago'
-            '-15s' implies '15 seconds ago'
-            '-15d' implies '15 days ago'
-            '-15w' implies '15 weeks ago'
-            'rt' implies real time
-            'now' implies current time
-            no other values are supported
+        See `get_severity` for supported values.
 
-        @return a list of tuples (event_id: severity) on valid request
-        None on invalid request.
+        @rtype: OrderedDict
+        @return: {event_id: {field: value}} in the order of `events`/`event_ids`;
+        a field missing on an event has a value of None. Events that could not
+        be found are left out. None on an invalid request.
         """
         # validate + normalize
         if not events and not event_ids:
@@ -280,21 +730,71 @@ class Event(Client):
         if events and not isinstance(events, list):
             raise TypeError(('Invalid type for `events`. Expecting list.'
                 ' Received type: {}').format(type(events).__name__))
+        if isinstance(fields, basestring):
+            fields = fields.split(split_by)
+        if not fields or not isinstance(fields, list):
+            raise TypeError(('Expecting `fields` to be a non-empty string or list.'
+                ' Received: {}').format(fields))
 
-        if events:
-            event_ids = self._extract(events, 'event_id')
-        else:
+        if not events:
             # we have event_ids, lets fetch events from index
             if isinstance(event_ids, basestring):
                 event_ids = event_ids.split(split_by)
             if not isinstance(event_ids, list):
                 return None
-            events = self._get_from_index(event_ids, **kwargs)
+            events = self._get_from_index(event_ids, missing=missing, **kwargs)
             if not events:
                 return None
-        severities = self._extract(events, 'severity')
-        
-        return zip(event_ids, severities)
+
+        rval = OrderedDict()
+        for event in self._get_object(events) or []:
+            event_id = event.get('event_id')
+            if event_id and event_id not in rval:
+                rval[event_id] = dict((i, event.get(i)) for i in fields)
+        return rval
+
+    def _get_field(self, events, event_ids, field, split_by, **kwargs):
+        """
+        return [(event_id, value)] of `field`. See `get_fields`.
+        """
+        rval = self.get_fields(events, event_ids, [field], split_by, **kwargs)
+        if rval is None:
+            return None
+        return [(k, v[field]) for k, v in rval.iteritems()]
+
+    def get_severity(self, events=None, event_ids=None, split_by=",", **kwargs):
+        """
+        given a list of event ids, return their severities
+        @type events: list of dicts
+        @param events: each dict in the list represents an event that was sent
+            to us by Splunk as an outcome of a Custom Action. the get_event()
+            method in class CustomEventActionBase generates such an item.
+        High performant.
+
+        @type event_ids: str or list
+        @param event_ids: a unique id of an event or list of event ids of events
+        Less performant.
+
+        @type split_by: str
+        @param split_by: if `event_ids` is of type basestring, we will split it
+        into many event ids;into a list. What is the separator? Defaults to `,`
+
+        @type kwargs: dict
+        @param kwargs: send in keys `earliest_time` and
+        `latest_time` with corresponding values if you know what you are doing.
+            Ex:
+            '-15m' implies '15 mins ago'
+            '-15s' implies '15 seconds ago'
+            '-15d' implies '15 days ago'
+            '-15w' implies '15 weeks ago'
+            'rt' implies real time
+            'now' implies current time
+            no other values are supported
+
+        @return a list of tuples (event_id: severity) on valid request
+        None on invalid request.
+        """
+        return self._get_field(events, event_ids, 'severity', split_by, **kwargs)
 
     def get_status(self, events=None, event_ids=None, split_by=",", **kwargs):
         """
@@ -329,31 +829,7 @@ class Event(Client):
         @return a list of tuples (event_id: severity) on valid request
         None on an invalid request
         """
-        # validate + normalize
-        if not events and not event_ids:
-            raise ValueError(('Expecting either `events` or `event_ids`. Both'
-                ' are None.'))
-        if events and isinstance(events, dict):
-            events = [events]
-        if events and not isinstance(events, list):
-            raise TypeError(('Invalid type for `events`. Expecting list.'
-                    ' Received type: {}').format(type(events).__name__))
-
-        if events:
-            event_ids = self._extract(events, 'event_id')
-        else:
-            # We have event_ids, lets fetch events from index
-            if isinstance(event_ids, basestring):
-                event_ids = event_ids.split(split_by)
-            if not isinstance(event_ids, list):
-                return None
-            events = self._get_from_index(event_ids, **kwargs)
-            if not events:
-                return None
-
-        statuses = self._extract(events, 'status')
-        
-        return zip(event_ids, statuses)
+        return self._get_field(events, event_ids, 'status', split_by, **kwargs)
 
     def get_owner(self, events=None, event_ids=None, split_by=",", **kwargs):
         """
@@ -388,36 +864,10 @@ class Event(Client):
         @rtype: list of tuples
         @return: [(event_id, owner)] if valid. None if invalid.
         """
-        # validate + normalize
-        if not events and not event_ids:
-            raise ValueError(('Expecting either `events` or `event_ids`. Both'
-                    ' are None.'))
-        if events and isinstance(events, dict):
-            events = [events]
-        if events and not isinstance(events, list):
-            raise TypeError(('Invalid type for `events`. Expecting list.'
-                    ' Received type: {}').format(type(events).__name__))
-
-        # normalization complete....
-        if events:
-            # get event_ids from these events...
-            event_ids = self._extract(events, 'event_id')
-        else:
-            # we have event_ids, lets fetch events from index
-            if isinstance(event_ids, basestring):
-                event_ids = event_ids.split(split_by)
-            if not isinstance(event_ids, list):
-                return None
-            events = self._get_from_index(event_ids, **kwargs)
-            if not events:
-                return None
-
-        # extract owners now that we have events...
-        owners = self._extract(events, 'owner')
-        
-        return zip(event_ids, owners)
+        return self._get_field(events, event_ids, 'owner', split_by, **kwargs)
 
-    def update(self, blob, split_by=',', **kwargs):
+    def update(self, blob, split_by=',', chunk_size=None, max_chunk_bytes=None,
+            known_state=None, skipped=None, **kwargs):
         """
         update each event id in `blob` with given data value individually
         This method only deals with updating `status`, `severity` and `owner`
@@ -442,6 +892,28 @@ class Event(Client):
                 },
                 ...
             ]
+            An event id found in many groups gets the fields of all of them;
+            where they clash, the later group wins. Event ids are sent in as
+            few requests as `chunk_size` and `max_chunk_bytes` allow.
+
+        @type chunk_size: int
+        @param chunk_size: (optional) most events per request. Chunks are sent
+        concurrently. Defaults to `CHUNK_SIZE`.
+
+        @type max_chunk_bytes: int
+        @param max_chunk_bytes: (optional) rough upper bound on the body of a
+        request. Defaults to `MAX_CHUNK_BYTES`.
+
+        @type known_state: boolean/list/dict
+        @param known_state: (optional) skip events that already have the
+        requested values. ``True`` fetches their state from the index; else
+        pass the events you have at hand, e.g. rows of your results file.
+        How many were skipped is logged.
+
+        @type skipped: list
+        @param skipped: (optional) event ids skipped as per `known_state`
+        are appended to this list.
+
         @type kwargs: dict
         @param kwargs: send in keys `earliest_time` and
         `latest_time` with corresponding values if you know what you are doing.
@@ -465,8 +937,14 @@ class Event(Client):
 
         if not blob:
             raise ValueError('Expecting `blob` to be non-empty.')
-
-        rval = []
+        if skipped is not None and not isinstance(skipped, list):
+            raise TypeError('Expecting `skipped` to be a list. Received: %s'
+                    % type(skipped).__name__)
+
+        # last writer wins per event id and field, same as if every group
+        # was sent on its own, in order
+        supported_keys = ('owner', 'severity', 'status')
+        merged = OrderedDict()
         for group in blob:
             # validate/sanitize...
             if not isinstance(group, dict):
@@ -474,31 +952,56 @@ class Event(Client):
                         '`%s`. Type: `%s`')%(group, type(group).__name__))
             if 'event_ids' not in group:
                 raise KeyError('Expecting `event_ids` in your input.')
-            keys = group.pop('event_ids')
+            keys = group['event_ids']
 
             # sanitize request, get rid of unsupported keys...
-            supported_keys = ('owner', 'severity', 'status', 'event_ids')
-            for k in group.keys():
+            fields = {}
+            for k, v in group.items():
+                if k == 'event_ids':
+                    continue
                 if k not in supported_keys:
-                    self.logger.info('Getting rid of `%s`: `%s`. Unsupported.'%(k, group[k]))
-                    group.pop(k)
+                    self.logger.info('Getting rid of `%s`: `%s`. Unsupported.'%(k, v))
+                    continue
+                fields[k] = v
 
             if isinstance(keys, basestring):
                 keys = keys.split(split_by)
-            data = []
             for i in keys:
-                event_data = deepcopy(group)
-                event_data['event_id'] = i
-                data.append(event_data)
+                merged.setdefault(i, {}).update(fields)
+
+        # coalesce event ids that end up with the same fields
+        coalesced = OrderedDict()
+        for i, fields in merged.items():
+            if fields:
+                coalesced.setdefault(tuple(sorted(fields.items())), []).append(i)
+        data = []
+        for fields, keys in coalesced.items():
             self.logger.info('Updating keys: `%s` with: %s. kwargs: %s',
-                    keys, data, kwargs)
-            objects = self.request('PUT', 'event_management_interface/notable_event',
-                    params=kwargs, data=data)
+                    keys, dict(fields), kwargs)
+            data.extend(dict(fields, event_id=i) for i in keys)
+        if known_state is not None and known_state is not False:
+            data, unchanged = self._drop_unchanged(data, known_state, **kwargs)
+            if skipped is not None:
+                skipped.extend(unchanged)
+
+        # chunks go out concurrently; the first failure, if any, is raised
+        # once all of them are done
+        rval = []
+        error = None
+        chunks = self._chunk(data, chunk_size, max_chunk_bytes)
+        for chunk, (objects, exc) in zip(chunks, self._put_chunks(chunks, **kwargs)):
+            self._sync_cache(chunk, exc)
+            if exc is not None:
+                error = error or exc
+                continue
             rval.extend(objects)
-            
+        if error is not None:
+            raise error
+
         return rval
 
-    def update_severity(self, event_ids, severity, split_by=',', **kwargs):
+    def update_severity(self, event_ids, severity, split_by=',', chunk_size=None,
+            max_chunk_bytes=None, known_state=None, **kwargs):
         """
         given list of event ids, update each of its severity to given
         severity value.
@@ -512,13 +1015,27 @@ class Event(Client):
         @param split_by: if `event_ids` is a string, what are the event ids split
         by? defaults to `,`
 
+        @type chunk_size: int
+        @param chunk_size: (optional) most events per request. Chunks are sent
+        concurrently. Defaults to `CHUNK_SIZE`.
+
+        @type max_chunk_bytes: int
+        @param max_chunk_bytes: (optional) rough upper bound on the body of a
+        request. Defaults to `MAX_CHUNK_BYTES`.
+
+        @type known_state: boolean/list/dict
+        @param known_state: (optional) skip events that already have the
+        requested value. ``True`` fetches their state from the index; else
+        pass the events you have at hand, e.g. rows of your results file.
+
         @type kwargs: dict
         @param kwargs: other time specific params like `earliest_time` and
         `latest_time` to locate your event. Pass nothing if you dont know these
         values.
 
-        @rtype: list
-        @return: updated notable event
+        @rtype: dict
+        @return: succeeded and failed event ids, plus the outcome of each
+        chunk. See `_update_events`.
         """
         if isinstance(event_ids, basestring):
             if not event_ids.strip():
@@ -539,12 +1056,11 @@ class Event(Client):
 
         self.logger.info('Updating keys: `%s` with: %s. kwargs: %s',
                 event_ids, data, kwargs)
-        objects = self.request('PUT', 'event_management_interface/notable_event', 
-                params=kwargs, data=data)
-        
-        return objects
+        return self._update_events(data, chunk_size, max_chunk_bytes,
+                known_state, **kwargs)
 
-    def update_status(self, event_ids, status, split_by=',', **kwargs):
+    def update_status(self, event_ids, status, split_by=',', chunk_size=None,
+            max_chunk_bytes=None, known_state=None, **kwargs):
         """
         given list of event ids, update each of its status to given
         value.
@@ -558,13 +1074,27 @@ class Event(Client):
         @param split_by: if `event_ids` is a string, what are the event ids split
         by? defaults to `,`
 
+        @type chunk_size: int
+        @param chunk_size: (optional) most events per request. Chunks are sent
+        concurrently. Defaults to `CHUNK_SIZE`.
+
+        @type max_chunk_bytes: int
+        @param max_chunk_bytes: (optional) rough upper bound on the body of a
+        request. Defaults to `MAX_CHUNK_BYTES`.
+
+        @type known_state: boolean/list/dict
+        @param known_state: (optional) skip events that already have the
+        requested value. ``True`` fetches their state from the index; else
+        pass the events you have at hand, e.g. rows of your results file.
+
         @type kwargs: dict
         @param kwargs: other time specific params like `earliest_time` and
         `latest_time` to locate your event. Pass nothing if you dont know these
         values.
 
-        @rtype: list
-        @return: updated notable event
+        @rtype: dict
+        @return: succeeded and failed event ids, plus the outcome of each
+        chunk. See `_update_events`.
         """
         if isinstance(event_ids, basestring):
             if not event_ids.strip():
@@ -585,12 +1115,11 @@ class Event(Client):
 
         self.logger.info('Updating keys: `%s` with: %s. kwargs: %s',
                 event_ids, data, kwargs)
-        objects = self.request('PUT', 'event_management_interface/notable_event', 
-                params=kwargs, data=data)
-        
-        return objects
+        return self._update_events(data, chunk_size, max_chunk_bytes,
+                known_state, **kwargs)
 
-    def update_owner(self, event_ids, owner, split_by=',', **kwargs):
+    def update_owner(self, event_ids, owner, split_by=',', chunk_size=None,
+            max_chunk_bytes=None, known_state=None, **kwargs):
         """given list of event ids, update each of its owner to given
         value.
         @type event_ids: basestring/list
@@ -603,13 +1132,27 @@ class Event(Client):
         @param split_by: if `event_ids` is a string, what are the event ids split
         by? defaults to `,`
 
+        @type chunk_size: int
+        @param chunk_size: (optional) most events per request. Chunks are sent
+        concurrently. Defaults to `CHUNK_SIZE`.
+
+        @type max_chunk_bytes: int
+        @param max_chunk_bytes: (optional) rough upper bound on the body of a
+        request. Defaults to `MAX_CHUNK_BYTES`.
+
+        @type known_state: boolean/list/dict
+        @param known_state: (optional) skip events that already have the
+        requested value. ``True`` fetches their state from the index; else
+        pass the events you have at hand, e.g. rows of your results file.
+
         @type kwargs: dict
         @param kwargs: other time specific params like `earliest_time` and
         `latest_time` to locate your event. Pass nothing if you dont know these
         values.
 
-        @rtype: list
-        @return: updated notable event
+        @rtype: dict
+        @return: succeeded and failed event ids, plus the outcome of each
+        chunk. See `_update_events`.
         """
         if isinstance(event_ids, basestring):
             if not event_ids.strip():
@@ -628,10 +1171,48 @@ class Event(Client):
 
         self.logger.info('Updating keys: `%s` with: %s. kwargs: %s',
                 event_ids, data, kwargs)
-        objects = self.request('PUT', 'event_management_interface/notable_event', 
-                params=kwargs, data=data)
-        
-        return objects
+        return self._update_events(data, chunk_size, max_chunk_bytes,
+                known_state, **kwargs)
+
+    def batch(self, max_events=None, max_delay=None, chunk_size=None,
+            max_chunk_bytes=None, known_state=None, **kwargs):
+        """
+        defer `status`, `severity` and `owner` updates and write them in bulk
+
+        Usage:
+        >>> with event.batch() as batch:
+        >>>     for row in action.get_event():
+        >>>         batch.update_status(row['event_id'], 'closed')
+        >>>         batch.update_owner(row['event_id'], 'admin')
+        >>> batch.results
+
+        @type max_events: int
+        @param max_events: (optional) flush once these many events are pending
+
+        @type max_delay: float
+        @param max_delay: (optional) flush on the first write made these many
+            seconds after the oldest pending one
+
+        @type chunk_size: int
+        @param chunk_size: (optional) most events per request
+
+        @type max_chunk_bytes: int
+        @param max_chunk_bytes: (optional) rough upper bound on the body of a
+        request
+
+        @type known_state: boolean/list/dict
+        @param known_state: (optional) skip events that already have the
+        requested values. See `update_status`.
+
+        @type kwargs: dict
+        @param kwargs: other time specific params like `earliest_time` and
+        `latest_time` sent with every request
+
+        @rtype: EventBatch
+        @return: a deferred writer; use it as a context manager
+        """
+        return EventBatch(self, max_events, max_delay, chunk_size,
+                max_chunk_bytes, known_state, **kwargs)
 
     def create_tag(self, event_id, tag_value):
         """
@@ -654,7 +1235,7 @@ class Event(Client):
                     ' basestring. Received: %s')%tag_value)
         data = {'event_id': event_id, 'tag_name': tag_value}
 
-        objects = self.request('POST', 'event_management_interface/notable_event_tag',
+        objects = self._send('POST', 'event_management_interface/notable_event_tag',
                 data=data)
 
         if any([
@@ -717,12 +1298,43 @@ class Event(Client):
         if not isinstance(event_id, basestring):
             raise TypeError(('Expecting `event_id` to be non-empty'
                 ' basestring. Received: %s')%event_id)
-        extension = 'event_management_interface/notable_event_tag/{}'.format(str(event_id))
-        objects = self.request('GET', extension, params={'is_event_id': True})
+        objects = self._get_tag_objects(event_id)
         tags = self._extract(objects, 'tag_name')
         
         return tags
 
+    def get_tags_for_events(self, event_ids, split_by=','):
+        """
+        fetch the tags of many events concurrently
+
+        @type event_ids: list/basestring
+        @param event_ids: ids of events
+
+        @type split_by: basestring
+        @param split_by: if `event_ids` is a string, what are the event ids
+        split by? defaults to `,`
+
+        @rtype: OrderedDict
+        @return: {event_id: [tag objects]} in the order of `event_ids`, tags
+            in the order splunkd returned them. Each tag object carries its
+            `_key` and `tag_name`. None for an event whose tags could not be
+            fetched; errors are logged.
+        """
+        return self._get_for_events(self._get_tag_objects, event_ids, split_by,
+                'tags')
+
+    def _get_tag_objects(self, event_id):
+        """
+        given an event_id, fetch its tag objects, `_key`s and all
+
+        @rtype: list
+        @return: list of tag objects as stored by splunkd
+        """
+        extension = 'event_management_interface/notable_event_tag/{}'.format(str(event_id))
+        objects = self._send('GET', extension, params={'is_event_id': True})
+        objects = self._get_object(objects) or []
+        return [objects] if isinstance(objects, dict) else objects
+
     def get_tag(self, tag_id):
         """
         given a tag id, fetch its value
@@ -755,7 +1367,7 @@ class Event(Client):
             raise TypeError(('Expecting `tag_id` to be non-empty'
                     ' basestring. Received: %s')%tag_id)
         extension = 'event_management_interface/notable_event_tag/{}'.format(str(tag_id))
-        objects = self.request('DELETE', extension)
+        objects = self._send('DELETE', extension)
         return
 
     def delete_all_tags(self, event_id):
@@ -772,6 +1384,292 @@ class Event(Client):
         objects = self.request('DELETE', extension, params={'is_event_id': True})
         return
 
+    def delete_all_tags_for_events(self, event_ids, split_by=',', checkpoint=None):
+        """
+        delete all tags of many events concurrently
+
+        @type event_ids: list/basestring
+        @param event_ids: ids of events
+
+        @type split_by: basestring
+        @param split_by: if `event_ids` is a string, what are the event ids
+        split by? defaults to `,`
+
+        @type checkpoint: basestring
+        @param checkpoint: (optional) path of a file to resume from. See
+            `_delete_for_events`.
+
+        @rtype: dict
+        @return: {'succeeded': [ids], 'failed': {id: error}, 'skipped': [ids]}
+        """
+        event_ids = self._normalize_ids(event_ids, split_by)
+        def delete(id_):
+            extension = 'event_management_interface/notable_event_tag/{}'.format(str(id_))
+            return self._send('DELETE', extension, params={'is_event_id': True})
+        return self._delete_for_events(delete, event_ids, checkpoint,
+                'delete all tags')
+
+    def _normalize_tags(self, tags, event_ids=None, split_by=','):
+        """
+        normalize the input of the bulk tag methods
+
+        @type tags: dict/list/basestring
+        @param tags: dict of event id to tag name(s), or tag name(s) to cross
+            with `event_ids`
+
+        @type event_ids: list/basestring
+        @param event_ids: event ids, when `tags` is not a dict
+
+        @rtype: OrderedDict
+        @return: event id to list of unique tag names
+        """
+        if isinstance(tags, dict):
+            if event_ids:
+                raise ValueError(('Expecting either a dict of `tags` or'
+                        ' `event_ids`, not both.'))
+            items = tags.items()
+        else:
+            if isinstance(event_ids, basestring):
+                event_ids = event_ids.split(split_by)
+            if not isinstance(event_ids, list) or not event_ids:
+                raise TypeError(('Expecting `event_ids` to be a non-empty'
+                        ' basestring/list. Received: %s')%event_ids)
+            items = [(i, tags) for i in event_ids]
+
+        rval = OrderedDict()
+        for event_id, names in items:
+            if isinstance(names, basestring):
+                names = [names]
+            if not isinstance(event_id, basestring) or \
+                    not isinstance(names, (list, tuple)):
+                raise TypeError(('Expecting event id to be a basestring and its'
+                        ' tags to be a basestring/list. Received: %s: %s')%(
+                        event_id, names))
+            for name in names:
+                if not isinstance(name, basestring) or not name.strip():
+                    raise ValueError(('Expecting tags to be non-empty'
+                            ' basestring. Received: %s')%name)
+            unique = rval.setdefault(event_id, [])
+            unique.extend(i for i in names if i not in unique)
+        return rval
+
+    def _fetch_failed(self, tag_names, exc):
+        """
+        failures to record when the current tags of an event could not be
+        fetched
+
+        @rtype: dict
+        @return: {tag_name: error} for each of `tag_names`. {None: error} if
+            there are none, so the event still shows up as failed.
+        """
+        return dict((i, str(exc)) for i in tag_names) or {None: str(exc)}
+
+    def create_tags(self, tags, event_ids=None, skip_existing=True, split_by=','):
+        """
+        create many tags on many events concurrently
+
+        Usage:
+        >>> event.create_tags({'event_id1': ['remedy', 'p1'], 'event_id2': 'snow'})
+        >>> event.create_tags(['remedy', 'p1'], event_ids=['event_id1', 'event_id2'])
+
+        @type tags: dict/list/basestring
+        @param tags: dict of event id to a tag name or list of tag names.
+            Or a tag name or list of tag names to create on every one of
+            `event_ids`.
+
+        @type event_ids: list/basestring
+        @param event_ids: (optional) event ids, when `tags` is not a dict
+
+        @type skip_existing: boolean
+        @param skip_existing: (optional) fetch the current tags of each event
+            first and do not create those again
+
+        @type split_by: basestring
+        @param split_by: if `event_ids` is a string, what are the event ids
+        split by? defaults to `,`
+
+        @rtype: dict
+        @return:
+            {
+                'tags': {'event_id1': {'remedy': 'tag_id1', ...}, ...},
+                'skipped': {'event_id1': ['p1'], ...},
+                'failed': {'event_id2': {'snow': 'error'}, ...}
+            }
+        """
+        wanted = self._normalize_tags(tags, event_ids, split_by)
+        rval = {'tags': {}, 'skipped': {}, 'failed': {}}
+
+        if skip_existing:
+            event_ids = list(wanted.keys())
+            results = self._dispatch(self._get_tag_objects, event_ids)
+            for event_id, (objects, exc) in zip(event_ids, results):
+                if exc is not None:
+                    rval['failed'][event_id] = self._fetch_failed(
+                            wanted.pop(event_id), exc)
+                    continue
+                existing = set(self._extract(objects, 'tag_name'))
+                skipped = [i for i in wanted[event_id] if i in existing]
+                if skipped:
+                    rval['skipped'][event_id] = skipped
+                    wanted[event_id] = [i for i in wanted[event_id] if i not in existing]
+
+        pairs = [(e, t) for e, names in wanted.items() for t in names]
+        results = self._dispatch(lambda pair: self.create_tag(*pair), pairs)
+        for (event_id, tag_name), (created, exc) in zip(pairs, results):
+            if exc is None and not created:
+                exc = 'Unable to create tag.'
+            if exc is not None:
+                rval['failed'].setdefault(event_id, {})[tag_name] = str(exc)
+            else:
+                rval['tags'].setdefault(event_id, {})[tag_name] = created['tag_id']
+
+        self.logger.info('Created %s tags on %s events. Skipped=%s Failed=%s',
+                sum(len(i) for i in rval['tags'].values()), len(rval['tags']),
+                sum(len(i) for i in rval['skipped'].values()),
+                sum(len(i) for i in rval['failed'].values()))
+        return rval
+
+    def delete_tags(self, tags, event_ids=None, split_by=','):
+        """
+        delete tags by name from many events concurrently
+
+        @type tags: dict/list/basestring
+        @param tags: same as for `create_tags`
+
+        @type event_ids: list/basestring
+        @param event_ids: (optional) event ids, when `tags` is not a dict
+
+        @type split_by: basestring
+        @param split_by: if `event_ids` is a string, what are the event ids
+        split by? defaults to `,`
+
+        @rtype: dict
+        @return: tag ids that were deleted, tag names the event does not
+            have, and failures. Same shape as for `create_tags`. If the tags
+            of an event could not be fetched and no tag names were given for
+            it, its error is keyed by None.
+        """
+        wanted = self._normalize_tags(tags, event_ids, split_by)
+        rval = {'tags': {}, 'skipped': {}, 'failed': {}}
+
+        event_ids = list(wanted.keys())
+        results = self._dispatch(self._get_tag_objects, event_ids)
+        doomed = []
+        for event_id, (objects, exc) in zip(event_ids, results):
+            if exc is not None:
+                rval['failed'][event_id] = self._fetch_failed(wanted[event_id], exc)
+                continue
+            found = set()
+            for i in objects:
+                if i.get('tag_name') in wanted[event_id] and i.get('_key'):
+                    doomed.append((event_id, i['tag_name'], i['_key']))
+                    found.add(i['tag_name'])
+            skipped = [i for i in wanted[event_id] if i not in found]
+            if skipped:
+                rval['skipped'][event_id] = skipped
+
+        results = self._dispatch(lambda i: self.delete_tag(i[2]), doomed)
+        for (event_id, tag_name, tag_id), (_, exc) in zip(doomed, results):
+            if exc is not None:
+                rval['failed'].setdefault(event_id, {})[tag_name] = str(exc)
+            else:
+                rval['tags'].setdefault(event_id, {})[tag_name] = tag_id
+
+        self.logger.info('Deleted %s tags from %s events. Skipped=%s Failed=%s',
+                sum(len(i) for i in rval['tags'].values()), len(rval['tags']),
+                sum(len(i) for i in rval['skipped'].values()),
+                sum(len(i) for i in rval['failed'].values()))
+        return rval
+
+    def set_tags(self, tags, event_ids=None, split_by=','):
+        """
+        make the tags of many events exactly the desired ones. The current
+        tags of each event are fetched once, then only the missing tags are
+        created and only the unwanted ones (duplicates included) deleted,
+        all of it concurrently. Safe to run again and again.
+
+        Usage:
+        >>> event.set_tags({'event_id1': ['remedy', 'p1'], 'event_id2': []})
+        >>> event.set_tags(['remedy'], event_ids=['event_id1', 'event_id2'])
+
+        @type tags: dict/list/basestring
+        @param tags: dict of event id to its desired tag name(s). Or tag
+            name(s) desired on every one of `event_ids`. An empty list
+            removes every tag.
+
+        @type event_ids: list/basestring
+        @param event_ids: (optional) event ids, when `tags` is not a dict
+
+        @type split_by: basestring
+        @param split_by: if `event_ids` is a string, what are the event ids
+        split by? defaults to `,`
+
+        @rtype: dict
+        @return:
+            {
+                'created': {'event_id1': {'p1': 'tag_id1'}, ...},
+                'deleted': {'event_id2': {'old': ['tag_id2', 'tag_id3']}, ...},
+                'failed': {'event_id1': {'remedy': 'error'}, ...},
+                'delete_failed': {'event_id2': {'tag_id4': 'error'}, ...}
+            }
+            `deleted` lists every copy of a tag name that went away.
+            `failed` holds tags that could not be created. If the current
+            tags of an event could not be fetched, each of its desired tags
+            fails; with none desired, the error is keyed by None.
+            `delete_failed` holds tags that could not be deleted, by tag id.
+        """
+        wanted = self._normalize_tags(tags, event_ids, split_by)
+        rval = {'created': {}, 'deleted': {}, 'failed': {}, 'delete_failed': {}}
+
+        event_ids = list(wanted.keys())
+        results = self._dispatch(self._get_tag_objects, event_ids)
+        changes = []
+        for event_id, (objects, exc) in zip(event_ids, results):
+            if exc is not None:
+                rval['failed'][event_id] = self._fetch_failed(wanted[event_id], exc)
+                continue
+            kept = set()
+            for i in objects:
+                if not i.get('_key'):
+                    continue
+                if i.get('tag_name') in wanted[event_id] and i['tag_name'] not in kept:
+                    kept.add(i['tag_name'])
+                else:
+                    changes.append(('deleted', event_id, i.get('tag_name'), i['_key']))
+            changes.extend(('created', event_id, i, None)
+                    for i in wanted[event_id] if i not in kept)
+
+        def apply(change):
+            action, event_id, tag_name, tag_id = change
+            if action == 'deleted':
+                self.delete_tag(tag_id)
+                return tag_id
+            created = self.create_tag(event_id, tag_name)
+            if not created:
+                raise Exception('Unable to create tag.')
+            return created['tag_id']
+
+        for (action, event_id, tag_name, old_id), (tag_id, exc) in zip(changes,
+                self._dispatch(apply, changes)):
+            if action == 'deleted':
+                if exc is not None:
+                    rval['delete_failed'].setdefault(event_id, {})[old_id] = str(exc)
+                else:
+                    rval['deleted'].setdefault(event_id, {}).setdefault(
+                            tag_name, []).append(tag_id)
+            elif exc is not None:
+                rval['failed'].setdefault(event_id, {})[tag_name] = str(exc)
+            else:
+                rval['created'].setdefault(event_id, {})[tag_name] = tag_id
+
+        self.logger.info(('Set tags on %s events. Created=%s Deleted=%s Failed=%s'
+                ' DeleteFailed=%s'), len(event_ids),
+                sum(len(i) for i in rval['created'].values()),
+                sum(len(j) for i in rval['deleted'].values() for j in i.values()),
+                sum(len(i) for i in rval['failed'].values()),
+                sum(len(i) for i in rval['delete_failed'].values()))
+        return rval
+
     def create_comment(self, event_id, comment):
         """
         for given event_id, add a new comment
@@ -791,12 +1689,7 @@ class Event(Client):
         if not isinstance(comment, basestring):
             raise TypeError(('Expecting `comment` to be non-empty'
                     ' basestring. Received: %s')%comment)
-        data = {
-                'event_id': event_id,
-                'comment': comment
-                }
-        objects = self.request('POST', 'event_management_interface/notable_event_comment',
-                data=data)
+        objects = self._post_comment(event_id, comment)
         if not objects:
            self.logger.error('Unable to create requested comment `%s` for event id: `%s`',
                     comment, event_id)
@@ -811,6 +1704,80 @@ class Event(Client):
                 comment id: `%s`', comment, event_id, objects.get('_key'))
         return rval
 
+    def _post_comment(self, event_id, comment):
+        """
+        POST a comment to `notable_event_comment`, no validation, no logging
+
+        @rtype: dict
+        @return: response of splunkd
+        """
+        data = {
+                'event_id': event_id,
+                'comment': comment
+                }
+        return self._send('POST', 'event_management_interface/notable_event_comment',
+                data=data)
+
+    def create_comments(self, comments, event_ids=None, split_by=','):
+        """
+        add many comments concurrently
+
+        Usage:
+        >>> event.create_comments([('event_id1', 'foo'), ('event_id2', 'bar')])
+        >>> event.create_comments('worklog updated', event_ids=['event_id1', 'event_id2'])
+
+        @type comments: list/basestring
+        @param comments: list of (event_id, comment) pairs. Or one comment to
+            add to every one of `event_ids`.
+
+        @type event_ids: list/basestring
+        @param event_ids: (optional) event ids, when `comments` is a string
+
+        @type split_by: basestring
+        @param split_by: if `event_ids` is a string, what are the event ids
+        split by? defaults to `,`
+
+        @rtype: list
+        @return: one dict per comment, in input order, consisting of event
+        id, comment, comment id and error. Either comment id or error is None.
+        """
+        if isinstance(comments, basestring):
+            if isinstance(event_ids, basestring):
+                event_ids = event_ids.split(split_by)
+            if not isinstance(event_ids, list) or not event_ids:
+                raise TypeError(('Expecting `event_ids` to be a non-empty'
+                        ' basestring/list. Received: %s')%event_ids)
+            comments = [(i, comments) for i in event_ids]
+        elif event_ids:
+            raise ValueError(('Expecting either (event_id, comment) pairs or'
+                    ' `event_ids`, not both.'))
+        if not isinstance(comments, list) or not comments:
+            raise TypeError(('Expecting `comments` to be a non-empty list.'
+                    ' Received: %s')%comments)
+        for pair in comments:
+            if not isinstance(pair, (list, tuple)) or len(pair) != 2 or \
+                    not all(isinstance(i, basestring) for i in pair):
+                raise TypeError(('Expecting (event_id, comment) pairs of'
+                        ' basestring. Received: %s')%(pair,))
+
+        rval = []
+        results = self._dispatch(lambda pair: self._post_comment(*pair), comments)
+        for (event_id, comment), (objects, exc) in zip(comments, results):
+            if exc is None and not objects:
+                exc = 'Unable to create comment.'
+            rval.append({
+                'event_id': event_id,
+                'comment': comment,
+                'comment_id': objects.get('_key') if exc is None else None,
+                'error': str(exc) if exc is not None else None
+                })
+
+        failed = [i for i in rval if i['error'] is not None]
+        log = self.logger.error if failed else self.logger.info
+        log('Created %s of %s comments. Failed=%s', len(rval) - len(failed),
+                len(rval), dict((i['event_id'], i['error']) for i in failed))
+        return rval
+
     def get_comment(self, comment_id):
         """
         for a given comment id, fetch the comment
@@ -840,11 +1807,149 @@ class Event(Client):
         if not isinstance(event_id, basestring):
             raise TypeError(('Expecting `event_id` to be non-empty'
                     ' basestring. Received: %s')%event_id)
-        extension = 'event_management_interface/notable_event_comment/{}'.format(str(event_id))
-        objects = self.request('GET', extension, params={'is_event_id': True})
+        objects = self._get_comment_objects(event_id)
         comments = self._extract(objects, 'comment')
         return comments
 
+    def _get_comment_objects(self, event_id):
+        """
+        given an event_id, fetch its comment objects, `_key`s and all
+
+        @rtype: list
+        @return: list of comment objects as stored by splunkd
+        """
+        extension = 'event_management_interface/notable_event_comment/{}'.format(str(event_id))
+        objects = self._send('GET', extension, params={'is_event_id': True})
+        objects = self._get_object(objects) or []
+        return [objects] if isinstance(objects, dict) else objects
+
+    def _normalize_ids(self, event_ids, split_by=','):
+        """
+        @rtype: list
+        @return: `event_ids` as a list without duplicates, in order
+        @raises TypeError: unless `event_ids` is a non-empty basestring/list
+        """
+        if isinstance(event_ids, basestring):
+            event_ids = event_ids.split(split_by)
+        if not isinstance(event_ids, list) or not event_ids or \
+                not all(isinstance(i, basestring) for i in event_ids):
+            raise TypeError(('Expecting `event_ids` to be a non-empty'
+                    ' basestring/list. Received: %s')%event_ids)
+        return list(OrderedDict.fromkeys(event_ids))
+
+    def _delete_for_events(self, delete, event_ids, checkpoint, action,
+            **operation):
+        """
+        call `delete` for each of many event ids concurrently, under the
+        client's concurrency and rate limits
+
+        @type delete: callable
+        @param delete: takes an event id
+
+        @type event_ids: list
+        @param event_ids: normalized event ids
+
+        @type checkpoint: basestring
+        @param checkpoint: (optional) path of a file listing event ids done
+            with, one per line. Ids in it are skipped and every id that
+            succeeds is appended to it right away, so a run that stopped
+            half way can be resumed by calling again with the same file.
+            Its first line names the operation; resuming a different one
+            from it raises a ValueError.
+
+        @type action: basestring
+        @param action: what is done, for the log and the checkpoint
+
+        @type operation: dict
+        @param operation: (optional) parameters that, with `action`, tell
+            one operation from another in the checkpoint
+
+        @rtype: dict
+        @return: {'succeeded': [ids], 'failed': {id: error},
+            'skipped': [ids already in `checkpoint`]}
+        """
+        done = set()
+        header = '# ' + json.dumps(dict(operation, action=action), sort_keys=True)
+        if checkpoint is not None and os.path.exists(checkpoint):
+            with open(checkpoint) as f:
+                lines = [line.strip() for line in f if line.strip()]
+            if lines and lines[0] != header:
+                raise ValueError(('Checkpoint `%s` belongs to another operation: %s.'
+                        ' Expecting: %s')%(checkpoint, lines[0][2:], header[2:]))
+            done = set(lines[1:])
+        pending = [i for i in event_ids if i not in done]
+        skipped = [i for i in event_ids if i in done]
+        if skipped:
+            self.logger.info('Resuming from `%s`. Skipping %s of %s events done'
+                    ' with already.', checkpoint, len(skipped), len(event_ids))
+
+        lock = threading.Lock()
+        handle = open(checkpoint, 'a') if checkpoint is not None else None
+        if handle is not None and handle.tell() == 0:
+            handle.write(header + '\n')
+            handle.flush()
+        def call(id_):
+            delete(id_)
+            if handle is not None:
+                with lock:
+                    handle.write(id_ + '\n')
+                    handle.flush()
+
+        try:
+            rval = self._summarize(pending, self._dispatch(call, pending), action)
+        finally:
+            if handle is not None:
+                handle.close()
+        rval['skipped'] = skipped
+        return rval
+
+    def _get_for_events(self, fetch, event_ids, split_by, what):
+        """
+        call `fetch` for each of many event ids concurrently
+
+        @type fetch: callable
+        @param fetch: takes an event id, returns a list of objects
+
+        @type what: basestring
+        @param what: what is fetched, for the log
+
+        @rtype: OrderedDict
+        @return: {event_id: list of objects} in the order of `event_ids`.
+            None for an event id that could not be fetched.
+        """
+        event_ids = self._normalize_ids(event_ids, split_by)
+        rval = OrderedDict()
+        failed = {}
+        for event_id, (objects, exc) in zip(event_ids,
+                self._dispatch(fetch, event_ids)):
+            rval[event_id] = objects
+            if exc is not None:
+                failed[event_id] = str(exc)
+        if failed:
+            self.logger.error('Unable to fetch %s for %s of %s events. Errors: %s',
+                    what, len(failed), len(event_ids), failed)
+        return rval
+
+    def get_comments_for_events(self, event_ids, split_by=','):
+        """
+        fetch the comments of many events concurrently
+
+        @type event_ids: list/basestring
+        @param event_ids: ids of events
+
+        @type split_by: basestring
+        @param split_by: if `event_ids` is a string, what are the event ids
+        split by? defaults to `,`
+
+        @rtype: OrderedDict
+        @return: {event_id: [comment objects]} in the order of `event_ids`,
+            comments in the order splunkd returned them. Each comment object
+            carries its `_key` and `comment`. None for an event whose comments
+            could not be fetched; errors are logged.
+        """
+        return self._get_for_events(self._get_comment_objects, event_ids,
+                split_by, 'comments')
+
     def delete_comment(self, comment_id):
         """
         delete the comment associated with comment id
@@ -875,6 +1980,31 @@ class Event(Client):
         objects = self.request('DELETE', extension, params={'is_event_id': True})
         return
 
+    def delete_all_comments_for_events(self, event_ids, split_by=',', checkpoint=None):
+        """
+        delete all comments of many events concurrently
+
+        @type event_ids: list/basestring
+        @param event_ids: ids of events
+
+        @type split_by: basestring
+        @param split_by: if `event_ids` is a string, what are the event ids
+        split by? defaults to `,`
+
+        @type checkpoint: basestring
+        @param checkpoint: (optional) path of a file to resume from. See
+            `_delete_for_events`.
+
+        @rtype: dict
+        @return: {'succeeded': [ids], 'failed': {id: error}, 'skipped': [ids]}
+        """
+        event_ids = self._normalize_ids(event_ids, split_by)
+        def delete(id_):
+            extension = 'event_management_interface/notable_event_comment/{}'.format(str(id_))
+            return self._send('DELETE', extension, params={'is_event_id': True})
+        return self._delete_for_events(delete, event_ids, checkpoint,
+                'delete all comments')
+
     def update_comment(self, event_id, comment_id, comment):
         """
         given  an event id, a comment_id update the comment.
@@ -933,9 +2063,12 @@ class Event(Client):
             Pass nothing if you dont know these values.
 
         @rtype dict:
-        @return: dict with list of ticket ids that are successfully updated
-        and list of ticket ids that were fail to update.
-
+        @return: event ids that were updated and event ids that failed to
+        update, mapped to their error. Ex:
+            {
+                'succeeded': ['event_id1', ...],
+                'failed': {'event_id2': 'error', ...}
+            }
         """
         if isinstance(event_ids, basestring):
             event_ids = event_ids.split(',')
@@ -949,7 +2082,7 @@ class Event(Client):
                 ' ticket_url=%s other params=%s'), event_ids, ticket_system
                 ,ticket_id, ticket_url, json.dumps(other_params))
 
-        for id_ in event_ids:
+        def put(id_):
             data = {
                 "ticket_system": ticket_system,
                 "ticket_url": ticket_url,
@@ -957,11 +2090,13 @@ class Event(Client):
             }
             data.update(other_params)
             extension = 'event_management_interface/ticketing/{}'.format(str(id_))
-            objects = self.request('PUT', extension, data=data)
-        
-        return objects
+            return self._send('PUT', extension, data=data)
+
+        event_ids = list(OrderedDict.fromkeys(event_ids))
+        return self._summarize(event_ids, self._dispatch(put, event_ids),
+                'update ticket info')
 
-    def delete_ticket_info(self, event_ids, ticket_system, ticket_id):
+    def delete_ticket_info(self, event_ids, ticket_system, ticket_id, checkpoint=None):
         """
         Delete external ticketing based information for given event_ids
         @type event_ids: list/basestring
@@ -977,10 +2112,14 @@ class Event(Client):
         @param ticket_id: identifier of an external ticket.
         Set ticket_id to None to delete all tickets for this ticket_system
 
-        @rtype dict:
-        @return: dict with list of ticket ids that are successfully deleted
-        and list of ticket ids that were fail to delete.
+        @type checkpoint: basestring
+        @param checkpoint: (optional) path of a file to resume from. See
+            `_delete_for_events`.
 
+        @rtype dict:
+        @return: event ids whose ticket info was deleted, event ids that
+        failed, mapped to their error, and event ids skipped as per
+        `checkpoint`. See `update_ticket_info`.
         """
         if isinstance(event_ids, basestring):
             event_ids = event_ids.split(',')
@@ -990,16 +2129,117 @@ class Event(Client):
         if not event_ids:
             raise ValueError('Expecting event_ids to have atleast 1 id. Received={}'.format(
                     event_ids))
-        self.logger.info(('Event ids=%s ticket_system=%s ticket_id=%s'
-                ' ticket_url=%s other params=%s'), event_ids, ticket_system
-                ,ticket_id)
+        self.logger.info('Event ids=%s ticket_system=%s ticket_id=%s',
+                event_ids, ticket_system, ticket_id)
 
-        for id_ in event_ids:
+        def delete(id_):
             extension = 'event_management_interface/ticketing/{}/{}/{}'\
                     .format(str(id_), ticket_system, str(ticket_id))
-            objects = self.request('DELETE', extension)
+            return self._send('DELETE', extension)
 
-        return objects
+        event_ids = list(OrderedDict.fromkeys(event_ids))
+        return self._delete_for_events(delete, event_ids, checkpoint,
+                'delete ticket info', ticket_system=ticket_system,
+                ticket_id=ticket_id)
+
+
+class EventBatch(object):
+    """
+    Buffers `status`, `severity` and `owner` updates, merges them per event
+    id with the last write winning per field, and writes them with as few
+    chunked PUTs as possible. Writes happen when the buffer reaches
+    `max_events`, on the first write after `max_delay`, on `flush()` and
+    when the `with` block exits. Get one from `Event.batch()`.
+    """
+    def __init__(self, event, max_events=None, max_delay=None, chunk_size=None,
+            max_chunk_bytes=None, known_state=None, **kwargs):
+        """
+        @type event: Event
+        @param event: does the writing
+
+        See `Event.batch()` for the other parameters.
+        """
+        self.event = event
+        self.max_events = max_events
+        self.max_delay = max_delay
+        self.chunk_size = chunk_size
+        self.max_chunk_bytes = max_chunk_bytes
+        self.known_state = known_state
+        self.kwargs = kwargs
+        # aggregated result of each flush, see `Event._update_events`
+        self.results = []
+        self._pending = OrderedDict()
+        self._oldest = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def _add(self, event_ids, field, value, split_by):
+        if isinstance(event_ids, basestring):
+            event_ids = event_ids.split(split_by)
+        if not isinstance(event_ids, list):
+            raise TypeError(('Expecting `event_ids` to be of type basestring/'
+                    'list. Received: {}. Type: {}').format(event_ids,
+                    type(event_ids).__name__))
+        if not event_ids or not isinstance(value, basestring) or not value.strip():
+            raise ValueError(('Expecting non-empty list of `event_ids`. and valid'
+                    ' %s string')%field)
+        with self._lock:
+            now = time.time()
+            if self._oldest is None:
+                self._oldest = now
+            for i in event_ids:
+                self._pending.setdefault(i, {})[field] = value
+            due = (self.max_events and len(self._pending) >= self.max_events) or \
+                    (self.max_delay is not None and now - self._oldest >= self.max_delay)
+        if due:
+            self.flush()
+
+    def update_severity(self, event_ids, severity, split_by=','):
+        """
+        defer `Event.update_severity`
+        """
+        self._add(event_ids, 'severity', severity, split_by)
+
+    def update_status(self, event_ids, status, split_by=','):
+        """
+        defer `Event.update_status`
+        """
+        self._add(event_ids, 'status', status, split_by)
+
+    def update_owner(self, event_ids, owner, split_by=','):
+        """
+        defer `Event.update_owner`
+        """
+        self._add(event_ids, 'owner', owner, split_by)
+
+    def flush(self):
+        """
+        write everything pending now
+
+        @rtype: dict/NoneType
+        @return: aggregated result of the write, None if nothing was pending
+        """
+        with self._lock:
+            pending, self._pending = self._pending, OrderedDict()
+            self._oldest = None
+        if not pending:
+            return None
+        data = [dict(fields, event_id=i) for i, fields in pending.items()]
+        self.event.logger.info('Flushing deferred updates of %s events.', len(data))
+        result = self.event._update_events(data, self.chunk_size,
+                self.max_chunk_bytes, self.known_state, **self.kwargs)
+        self.results.append(result)
+        return result
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # updates asked for before an error would have been written without
+        # batching too, so write them regardless
+        self.flush()
 
 
 class EventGroup(Client):
@@ -1007,7 +2247,7 @@ class EventGroup(Client):
     Import this class to operate on ITSI Event Group.
     """
     def __init__(self, username, password, base_url, logger=default_logger, session=None,
-                 silent=False, delay=0.0):
+                 silent=False, delay=0.0, cache=None, **kwargs):
 
         """
         @type username: string
@@ -1033,9 +2273,18 @@ class EventGroup(Client):
         @type delay: float
         @param delay: (option) Ensures a minimum delay of seconds between
             requests.
+
+        @type cache: EventCache
+        @param cache: (optional) read-through cache of event groups, keyed by group id.
+            Our own writes update or invalidate its entries.
+
+        @type kwargs: dict
+        @param kwargs: (optional) other `Client` options such as
+            `pool_maxsize`. See `Client.__init__`.
         """
+        self.cache = cache
         super(EventGroup, self).__init__(username, password, base_url, logger, session,
-                                         silent, delay)
+                                         silent, delay, **kwargs)
 
         
     def is_valid_drilldown(self, drilldown):
@@ -1122,7 +2371,7 @@ class EventGroup(Client):
                 raise ValueError('Drilldown data must have link and name')
         clean_drilldown = self._clean_drilldown(drilldown)
         try:
-            drilldown_list = self.get(group_id).get('drilldown', [])
+            drilldown_list = self._fetch_group(group_id).get('drilldown', [])
         except AttributeError:
             raise TypeError('Group is not of type dict')
         try:
@@ -1133,8 +2382,7 @@ class EventGroup(Client):
                 'event_id': group_id,
                 '_key': group_id
         }
-        extension = 'event_management_interface/notable_event_group'
-        objects = self.request('PUT', extension, data=data)
+        objects = self._put_group(group_id, data)
         
         return objects
 
@@ -1150,7 +2398,7 @@ class EventGroup(Client):
         """
         if not self.is_valid_drilldown(drilldown):
             raise ValueError('Drilldown data must have link and name')
-        group = self.get(group_id)
+        group = self._fetch_group(group_id)
         if not group:
             raise ValueError('Group does not exist')
         clean_drilldown = self._clean_drilldown(drilldown)
@@ -1178,8 +2426,7 @@ class EventGroup(Client):
                 'event_id': group_id,
                 '_key': group_id
         }
-        extension = 'event_management_interface/notable_event_group'
-        objects = self.request('PUT', extension, data=data)
+        objects = self._put_group(group_id, data)
 
         return objects
 
@@ -1196,7 +2443,7 @@ class EventGroup(Client):
 
         if not self.is_valid_drilldown(drilldown):
             raise ValueError('Drilldown data must have link and name')
-        group = self.get(group_id)
+        group = self._fetch_group(group_id)
         if not group:
             raise ValueError('Group does not exist')
         clean_drilldown = self._clean_drilldown(drilldown)
@@ -1221,17 +2468,41 @@ class EventGroup(Client):
                 'event_id': group_id,
                 '_key': group_id
         }
-        extension = 'event_management_interface/notable_event_group'
-        objects = self.request('PUT', extension, data=data)
+        objects = self._put_group(group_id, data)
 
         return objects
 
+    def _put_group(self, group_id, data):
+        """
+        PUT `data` to a group, dropping it from `cache` either way
+        """
+        extension = 'event_management_interface/notable_event_group'
+        try:
+            return self.request('PUT', extension, data=data)
+        finally:
+            if self.cache is not None:
+                self.cache.invalidate(str(group_id))
+
     def get(self, group_id):
         """
-        Get the EventGroup Object
+        Get the EventGroup Object. Served from `cache` when it has the group.
         @type group_id: string
         @param group_id: id of the group where add_drilldown to be operated on
         """
+        if self.cache is not None:
+            objects = self.cache.get(str(group_id))
+            if objects is not None:
+                return objects
+        return self._fetch_group(group_id)
+
+    def _fetch_group(self, group_id):
+        """
+        GET a group from splunkd, bypassing `cache`, and refresh its entry.
+        Drilldown writes PUT back the whole list they read, so they must
+        start from the current one, not from a cached copy.
+        """
         extension = 'event_management_interface/notable_event_group/{}'.format(str(group_id))
         objects = self.request('GET', extension)
+        if self.cache is not None and isinstance(objects, dict) and objects:
+            self.cache.set(str(group_id), objects)
         return objects
@@ -5,8 +5,16 @@ Define Base Classes applicable for all Event Management here.
 """
 import time
 import json
-import requests
+import random
 import logging
+import threading
+from copy import deepcopy
+from collections import OrderedDict
+from email.utils import parsedate_tz, mktime_tz
+from multiprocessing.pool import ThreadPool
+
+import requests
+from requests.adapters import HTTPAdapter, DEFAULT_POOLSIZE
 from logging.handlers import RotatingFileHandler
 
 def setup_logger(log_name='sdk.log', logger_name='event_managment_sdk', level=logging.INFO):
@@ -20,13 +28,620 @@ def setup_logger(log_name='sdk.log', logger_name='event_managment_sdk', level=lo
     default_logger.addHandler(file_handler)
     return default_logger
 
+def _endpoint(extension):
+    """
+    given a URL extension, return the endpoint it targets, sans object ids
+    and query string.
+    Ex: `event_management_interface/notable_event_tag/<tag id>` yields
+    `event_management_interface/notable_event_tag`
+    """
+    parts = [i for i in (extension or '').split('?')[0].split('/') if i]
+    if len(parts) > 1 and parts[0] == 'event_management_interface':
+        return '/'.join(parts[:2])
+    return parts[0] if parts else ''
+
+class TokenBucket(object):
+    """
+    Lets requests through at a sustained `rate` per second, with bursts of
+    up to `burst` requests. Thread safe; callers over the rate are queued
+    up and put to sleep till their turn comes.
+    """
+    def __init__(self, rate, burst=1):
+        """
+        @type rate: float
+        @param rate: sustained requests per second
+
+        @type burst: int
+        @param burst: (optional) requests allowed back to back after a
+            quiet period
+        """
+        if not isinstance(rate, (int, float)) or rate <= 0:
+            raise ValueError('Expecting `rate` to be a positive number. Received: %s'%rate)
+        if not isinstance(burst, int) or burst < 1:
+            raise ValueError('Expecting `burst` to be a positive int. Received: %s'%burst)
+        self.rate = float(rate)
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """
+        take `tokens` from the bucket, sleeping till they are available
+
+        @rtype: float
+        @return: seconds spent waiting
+        """
+        with self._lock:
+            now = time.time()
+            self._tokens = min(self.burst,
+                    self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # going below zero reserves tokens that have yet to drip in,
+            # so waiting callers are served in order
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0.0:
+            time.sleep(wait)
+        return wait
+
+class RateLimiter(object):
+    """
+    Throttles Client requests with token buckets. Requests go to the bucket
+    of their endpoint class if there is one, else to the default bucket.
+
+    Usage:
+    >>> limiter = RateLimiter(rate=50, burst=10, buckets={
+    ...     'PUT notable_event': (5, 2),
+    ...     'notable_event_tag': TokenBucket(20, 5)})
+    >>> event = Event(username, password, base_url, rate_limiter=limiter)
+    """
+    def __init__(self, rate=None, burst=1, buckets=None):
+        """
+        @type rate: float
+        @param rate: (optional) requests per second for requests without a
+            bucket of their own. None means no limit.
+
+        @type burst: int
+        @param burst: (optional) burst size of the default bucket
+
+        @type buckets: dict
+        @param buckets: (optional) endpoint class to bucket. An endpoint class
+            is an endpoint name such as `notable_event_tag`, optionally
+            prefixed by an HTTP method such as `POST notable_event_tag`. The
+            bucket is a `TokenBucket` or a `(rate, burst)` tuple.
+        """
+        self.default = TokenBucket(rate, burst) if rate else None
+        self.buckets = {}
+        for key, bucket in (buckets or {}).items():
+            if not isinstance(bucket, TokenBucket):
+                bucket = TokenBucket(*bucket)
+            self.buckets[key] = bucket
+
+    def get_bucket(self, method, extension):
+        """
+        @rtype: TokenBucket/NoneType
+        @return: bucket the request counts against, None if unlimited
+        """
+        name = _endpoint(extension).split('/')[-1]
+        key = '{} {}'.format(method.upper(), name)
+        return self.buckets.get(key) or self.buckets.get(name) or self.default
+
+    def acquire(self, method, extension):
+        """
+        wait till a request to `extension` may be sent
+
+        @rtype: float
+        @return: seconds spent waiting
+        """
+        bucket = self.get_bucket(method, extension)
+        return bucket.acquire() if bucket else 0.0
+
+class RetryPolicy(object):
+    """
+    Decides whether a failed request is worth another attempt and how long
+    to wait before it. Waits grow exponentially with full jitter, honour a
+    `Retry-After` header and never overrun the total time budget.
+
+    Usage:
+    >>> event = Event(username, password, base_url,
+    ...     retry_policy=RetryPolicy(max_retries=5, total_timeout=60))
+    """
+    IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, max_retries=5, backoff=0.5, max_backoff=30.0,
+                 total_timeout=120.0, methods=IDEMPOTENT_METHODS,
+                 statuses=RETRY_STATUSES):
+        """
+        @type max_retries: int
+        @param max_retries: (optional) attempts after the first one
+
+        @type backoff: float
+        @param backoff: (optional) seconds; the wait before retry `n` is a
+            random value between 0 and `backoff * 2**n`
+
+        @type max_backoff: float
+        @param max_backoff: (optional) cap on a single wait, in seconds
+
+        @type total_timeout: float
+        @param total_timeout: (optional) no retry is made if it would
+            start more than these many seconds after the first attempt
+
+        @type methods: tuple
+        @param methods: (optional) HTTP methods that are safe to retry
+
+        @type statuses: tuple
+        @param statuses: (optional) HTTP status codes worth retrying
+        """
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.total_timeout = total_timeout
+        self.methods = tuple(i.upper() for i in methods)
+        self.statuses = statuses
+
+    def _retry_after(self, response):
+        """
+        @rtype: float/NoneType
+        @return: seconds asked for by a `Retry-After` header, None if absent
+        """
+        value = response.headers.get('Retry-After') if response is not None else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        date = parsedate_tz(value)
+        if date is None:
+            return None
+        return max(0.0, mktime_tz(date) - time.time())
+
+    def get_delay(self, method, attempt, elapsed, response=None, exception=None):
+        """
+        given the outcome of an attempt, tell how long to wait before the
+        next one
+
+        @type method: basestring
+        @param method: HTTP method of the request
+
+        @type attempt: int
+        @param attempt: number of retries made so far
+
+        @type elapsed: float
+        @param elapsed: seconds since the first attempt started
+
+        @type response: <class 'requests.models.Response'> object
+        @param response: (optional) response received, if any
+
+        @type exception: Exception
+        @param exception: (optional) connection error or timeout raised, if any
+
+        @rtype: float/NoneType
+        @return: seconds to wait, None if the request should not be retried
+        """
+        if method.upper() not in self.methods or attempt >= self.max_retries:
+            return None
+        if exception is None and (response is None or
+                response.status_code not in self.statuses):
+            return None
+        delay = self._retry_after(response)
+        if delay is None:
+            delay = random.uniform(0, min(self.max_backoff,
+                    self.backoff * (2 ** attempt)))
+        if elapsed + delay > self.total_timeout:
+            return None
+        return delay
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of sending a request to an endpoint whose circuit is
+    open. Spool or shed the work and try again after `retry_in` seconds.
+    """
+    def __init__(self, key, retry_in):
+        super(CircuitOpenError, self).__init__(('Circuit open for `%s`. Retry in'
+                ' %.1fs.')%(key, retry_in))
+        self.key = key
+        self.retry_in = retry_in
+
+class CircuitBreaker(object):
+    """
+    Keeps a circuit per endpoint. A circuit opens after `failure_threshold`
+    consecutive failures and then fails requests fast with a
+    `CircuitOpenError`. Once `recovery_timeout` seconds have passed, it goes
+    half-open and lets `half_open_max_calls` trial requests through; a
+    success closes it, a failure opens it again.
+
+    Usage:
+    >>> event = Event(username, password, base_url,
+    ...     circuit_breaker=CircuitBreaker(failure_threshold=10))
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+    FAILURE_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30.0,
+                 half_open_max_calls=1, statuses=FAILURE_STATUSES, logger=None):
+        """
+        @type failure_threshold: int
+        @param failure_threshold: (optional) consecutive failures that open
+            a circuit
+
+        @type recovery_timeout: float
+        @param recovery_timeout: (optional) seconds a circuit stays open
+            before trial requests are let through
+
+        @type half_open_max_calls: int
+        @param half_open_max_calls: (optional) trial requests in flight at
+            once while half-open
+
+        @type statuses: tuple
+        @param statuses: (optional) HTTP status codes counted as failures,
+            on top of connection errors and timeouts
+
+        @type logger: object of type logger
+        @param logger: (optional) where state changes are logged. Defaults to
+            the logger of the first Client using this breaker.
+        """
+        if not isinstance(failure_threshold, int) or failure_threshold < 1:
+            raise ValueError(('Expecting `failure_threshold` to be a positive'
+                    ' int. Received: %s')%failure_threshold)
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.statuses = statuses
+        self.logger = logger
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+    def _set_state(self, key, circuit, state):
+        if circuit['state'] == state:
+            return
+        if self.logger:
+            self.logger.warning(('Circuit for `%s` is now %s, was %s.'
+                    ' Consecutive failures: %s.'), key, state, circuit['state'],
+                    circuit['failures'])
+        circuit['state'] = state
+        circuit['trials'] = 0
+        if state == self.OPEN:
+            circuit['opened_at'] = time.time()
+        elif state == self.CLOSED:
+            circuit['failures'] = 0
+
+    def get_state(self, key):
+        """
+        @rtype: basestring
+        @return: state of the circuit for `key`
+        """
+        with self._lock:
+            circuit = self._circuits.get(key)
+            return circuit['state'] if circuit else self.CLOSED
+
+    def before_request(self, key):
+        """
+        call before sending a request to the endpoint identified by `key`
+
+        @raises CircuitOpenError: if the request must not be sent
+        """
+        with self._lock:
+            circuit = self._circuits.setdefault(key, {'state': self.CLOSED,
+                    'failures': 0, 'trials': 0, 'opened_at': None})
+            if circuit['state'] == self.OPEN:
+                retry_in = circuit['opened_at'] + self.recovery_timeout - time.time()
+                if retry_in > 0:
+                    raise CircuitOpenError(key, retry_in)
+                self._set_state(key, circuit, self.HALF_OPEN)
+            if circuit['state'] == self.HALF_OPEN:
+                if circuit['trials'] >= self.half_open_max_calls:
+                    raise CircuitOpenError(key, 0.0)
+                circuit['trials'] += 1
+
+    def record(self, key, response=None, exception=None):
+        """
+        call with the outcome of a request sent to the endpoint identified
+        by `key`
+        """
+        failed = exception is not None or (response is not None and
+                response.status_code in self.statuses)
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None:
+                return
+            if not failed:
+                # a request sent before the circuit opened may come back fine
+                # after; that proves nothing, only trial requests may close it
+                if circuit['state'] == self.HALF_OPEN:
+                    self._set_state(key, circuit, self.CLOSED)
+                elif circuit['state'] == self.CLOSED:
+                    circuit['failures'] = 0
+                return
+            circuit['failures'] += 1
+            if circuit['state'] == self.HALF_OPEN or \
+                    circuit['failures'] >= self.failure_threshold:
+                self._set_state(key, circuit, self.OPEN)
+
+class AdaptiveConcurrencyLimit(object):
+    """
+    Caps the number of requests in flight with an AIMD controller. The limit
+    grows additively, by `increase` per window of successful requests, while
+    latency stays within `latency_tolerance` times its running average. It is
+    cut multiplicatively by `decrease` on timeouts, connection errors, 429s
+    and 5xx responses. Every change of the limit is reported as a metric via
+    the logger and the optional `on_change` callback.
+
+    Usage:
+    >>> limit = AdaptiveConcurrencyLimit(initial=8, max_limit=64)
+    >>> event = Event(username, password, base_url, concurrency_limit=limit)
+    """
+    def __init__(self, initial=4, min_limit=1, max_limit=32, increase=1.0,
+                 decrease=0.5, latency_tolerance=2.0, logger=None, on_change=None):
+        """
+        @type initial: int
+        @param initial: (optional) requests in flight to start with
+
+        @type min_limit: int
+        @param min_limit: (optional) the limit never drops below this
+
+        @type max_limit: int
+        @param max_limit: (optional) the limit never grows above this
+
+        @type increase: float
+        @param increase: (optional) growth of the limit per window of
+            requests that came back fast and fine
+
+        @type decrease: float
+        @param decrease: (optional) factor the limit is multiplied by on
+            overload, between 0 and 1
+
+        @type latency_tolerance: float
+        @param latency_tolerance: (optional) a request slower than this many
+            times the average latency stops the limit from growing
+
+        @type logger: object of type logger
+        @param logger: (optional) where changes of the limit are reported.
+            Defaults to the logger of the first Client using this limit.
+
+        @type on_change: callable
+        @param on_change: (optional) called with the new limit on every change
+        """
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError(('Expecting 1 <= min_limit <= initial <= max_limit.'
+                    ' Received: %s, %s, %s')%(min_limit, initial, max_limit))
+        if not 0 < decrease < 1:
+            raise ValueError('Expecting `decrease` between 0 and 1. Received: %s'%decrease)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.logger = logger
+        self.on_change = on_change
+        self._limit = float(initial)
+        self._in_flight = 0
+        self._latency = None
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self):
+        """
+        @rtype: int
+        @return: requests currently allowed in flight
+        """
+        return int(self._limit)
+
+    @property
+    def in_flight(self):
+        """
+        @rtype: int
+        @return: requests currently in flight
+        """
+        return self._in_flight
+
+    def acquire(self):
+        """
+        wait till another request may be sent
+        """
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def _set_limit(self, limit):
+        old = int(self._limit)
+        self._limit = min(float(self.max_limit), max(float(self.min_limit), limit))
+        if int(self._limit) == old:
+            return
+        if self.logger:
+            self.logger.info('metric=concurrency_limit value=%s previous=%s',
+                    int(self._limit), old)
+        if self.on_change:
+            self.on_change(int(self._limit))
+
+    def release(self, latency, overloaded=False, failed=False):
+        """
+        report the outcome of a request sent after `acquire()`
+
+        @type latency: float
+        @param latency: seconds the request took
+
+        @type overloaded: boolean
+        @param overloaded: whether splunkd pushed back, i.e. a timeout,
+            connection error, 429 or 5xx
+
+        @type failed: boolean
+        @param failed: whether the request failed for another reason, ex: a
+            404 or a bad response body. Frees its slot but tells nothing about
+            load, so the limit stays as is.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            now = time.time()
+            if overloaded:
+                # one cut per round trip; requests already in flight when we
+                # cut will fail too and should not cut again
+                if now - self._last_decrease >= (self._latency or 0.0):
+                    self._last_decrease = now
+                    self._set_limit(self._limit * self.decrease)
+            elif not failed:
+                if self._latency is None or \
+                        latency <= self._latency * self.latency_tolerance:
+                    self._set_limit(self._limit + self.increase / self._limit)
+                self._latency = latency if self._latency is None else \
+                        0.9 * self._latency + 0.1 * latency
+            self._condition.notify_all()
+
+class EventCache(object):
+    """
+    Local read-through cache of notable events or event groups, keyed by
+    their id. Entries expire `ttl` seconds after they were stored and the
+    least recently used ones are evicted once there are more than
+    `max_size`. Values are copied in and out, so callers may modify what
+    they get without touching the cache. Thread safe.
+
+    Usage:
+    >>> cache = EventCache(max_size=10000, ttl=300)
+    >>> event = Event(username, password, base_url, cache=cache)
+    >>> event.get_status(event_ids=ids)  # goes to splunkd
+    >>> event.get_owner(event_ids=ids)   # served from the cache
+    >>> cache.stats()
+    """
+    def __init__(self, max_size=1024, ttl=60.0):
+        """
+        @type max_size: int
+        @param max_size: (optional) most entries kept at once
+
+        @type ttl: float
+        @param ttl: (optional) seconds an entry stays valid. None never
+            expires entries.
+        """
+        if not isinstance(max_size, int) or max_size < 1:
+            raise ValueError('Expecting `max_size` to be a positive int. Received: %s'%max_size)
+        if ttl is not None and (not isinstance(ttl, (int, float)) or ttl <= 0):
+            raise ValueError('Expecting `ttl` to be a positive number. Received: %s'%ttl)
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _lookup(self, key):
+        # expects the lock held. Returns the live entry, refreshing its
+        # recency, or None
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        if entry[0] is not None and entry[0] <= time.time():
+            return None
+        self._entries[key] = entry
+        return entry
+
+    def get(self, key):
+        """
+        @type key: basestring
+        @param key: event or group id
+
+        @return: a copy of the cached value; None on a miss
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return deepcopy(entry[1])
+
+    def get_many(self, keys):
+        """
+        @type keys: list
+        @param keys: event or group ids
+
+        @rtype: dict
+        @return: {key: copy of the cached value} for keys found
+        """
+        return dict((k, v) for k, v in ((k, self.get(k)) for k in keys)
+                if v is not None)
+
+    def set(self, key, value):
+        """
+        store `value` under `key`, evicting the least recently used entries
+        if need be
+        """
+        expires = time.time() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (expires, deepcopy(value))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def update(self, key, fields):
+        """
+        merge `fields` into the cached value of `key`, if there is one.
+        Used to reflect our own writes without another read.
+
+        @type fields: dict
+        @param fields: fields that were written
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None and isinstance(entry[1], dict):
+                entry[1].update(deepcopy(fields))
+
+    def invalidate(self, key):
+        """
+        drop the cached value of `key`
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        drop all entries
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        @rtype: dict
+        @return: {'hits', 'misses', 'evictions', 'size'}
+        """
+        return {'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'size': len(self)}
+
+def _is_overload(exception):
+    """
+    tell whether a request failed because splunkd pushed back
+    """
+    if isinstance(exception, (requests.Timeout, requests.ConnectionError,
+            CircuitOpenError)):
+        return True
+    response = getattr(exception, 'response', None)
+    return response is not None and _is_overload_status(response.status_code)
+
+def _is_overload_status(status_code):
+    """
+    tell whether an HTTP status code means splunkd pushed back
+    """
+    return status_code is not None and (status_code == 429 or status_code >= 500)
+
 class Client(object):
     '''All SDK classes to inherit this as their base class
     tracks stuff like base_url, session etc.
     '''
     _AVAILABLE_VERSIONS = ('1.0')
     def __init__(self, username, password, base_url, logger, session=None,
-                 silent=False, delay=0.0):
+                 silent=False, delay=0.0, pool_connections=None, pool_maxsize=None,
+                 pool_block=False, keep_alive=True, rate_limiter=None,
+                 retry_policy=None, circuit_breaker=None, concurrency_limit=None):
         """
         @type username: string
         @param username: Splunk username
@@ -50,13 +665,58 @@ class Client(object):
 
         @type delay: float
         @param delay: (option) Ensures a minimum delay of seconds between
-            requests.
+            requests. Ignored if there is a `rate_limiter`.
+
+        @type pool_connections: int
+        @param pool_connections: (optional) number of per host connection
+            pools to keep. Defaults to requests' own default of 10.
+
+        @type pool_maxsize: int
+        @param pool_maxsize: (optional) max connections kept per host. Size
+            it to the number of threads sharing this client, so that each
+            thread reuses a warm connection. Defaults to 10.
+
+        @type pool_block: boolean
+        @param pool_block: (optional) When ``True``, a thread waits for a free
+            pooled connection instead of opening a throw-away one.
+
+        The pool options only apply to a session the client creates. A
+        `session` passed in is used as is; mount an `HTTPAdapter` on it
+        yourself to size its pool.
+
+        @type keep_alive: boolean
+        @param keep_alive: (optional) When ``False``, every connection is
+            closed once its request is done.
+
+        @type rate_limiter: RateLimiter
+        @param rate_limiter: (optional) throttles requests. It is attached to
+            the session, so every client later built on the same session
+            shares it unless given one of its own.
+
+        @type retry_policy: RetryPolicy
+        @param retry_policy: (optional) retries requests that failed on a
+            connection error, a timeout or a transient HTTP status. No
+            retries are made without one.
+
+        @type circuit_breaker: CircuitBreaker
+        @param circuit_breaker: (optional) fails requests fast with a
+            `CircuitOpenError` while their endpoint keeps failing. Like the
+            `rate_limiter`, it is shared by clients built on the same session.
+
+        @type concurrency_limit: AdaptiveConcurrencyLimit
+        @param concurrency_limit: (optional) caps requests in flight for bulk
+            operations. Shared by clients built on the same session. Each
+            client gets a default one otherwise.
+
+        A Client is safe to share between threads; nothing a request does
+        changes state that other requests rely on.
         """
         self.headers={"Content-Type": "application/json"}
+        if not keep_alive:
+            self.headers['Connection'] = 'close'
         self.base_url = '{}'.format(base_url)
         self.silent = silent
         self.delay = delay
-        self._last_request_time = None
         if session:
             if not isinstance(session, requests.sessions.Session):
                 raise TypeError('session must be requests.sessions.Session object.')
@@ -72,10 +732,42 @@ class Client(object):
                     ' non empty string, for both your username and password.'))
             session = requests.Session()
             session.auth = (username, password)
+            # only a session of our own is re-mounted: a shared one keeps the
+            # adapters, and so the pooled connections, its owner gave it.
+            if pool_connections or pool_maxsize or pool_block:
+                adapter = HTTPAdapter(pool_connections=pool_connections or DEFAULT_POOLSIZE,
+                        pool_maxsize=pool_maxsize or DEFAULT_POOLSIZE, pool_block=pool_block)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+        if rate_limiter:
+            session.rate_limiter = rate_limiter
+        else:
+            rate_limiter = getattr(session, 'rate_limiter', None)
+        if not rate_limiter and delay > 0.0:
+            rate_limiter = RateLimiter(rate=1.0/delay)
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        if circuit_breaker:
+            session.circuit_breaker = circuit_breaker
+        else:
+            circuit_breaker = getattr(session, 'circuit_breaker', None)
+        self.circuit_breaker = circuit_breaker
+        if concurrency_limit:
+            session.concurrency_limit = concurrency_limit
+        else:
+            concurrency_limit = getattr(session, 'concurrency_limit', None) or \
+                    AdaptiveConcurrencyLimit()
+        self.concurrency_limit = concurrency_limit
+        # status code of the last response, per thread; lets `_send` spot
+        # overload on silent clients, where error statuses are not raised
+        self._last_status = threading.local()
         self.session = session
         if not logger:
             logger = setup_logger()
         self.logger = logger
+        for i in (circuit_breaker, concurrency_limit):
+            if i and not i.logger:
+                i.logger = logger
         
     def request(self, method, extension=None, params=None, headers=None,
                 data=None, verify=False, **kwargs):
@@ -93,8 +785,8 @@ class Client(object):
         @param params: (optional) The URL query parameters
 
         @type headers: dict
-        @param headers: (optional) Extra headers to sent with the request.
-            Existing header keys can be overwritten.
+        @param headers: (optional) Extra headers to sent with this request
+            only. Existing header keys can be overwritten.
 
         @type data: dict
         @param data: (optional) Dictionary
@@ -108,27 +800,111 @@ class Client(object):
 
         @rtype: dict
         @return: Return a dictionary which hold information about requested resource
+
+        @raises CircuitOpenError: if the circuit breaker does not let the
+            request through
         """
         url = '{}/{}'.format(self.base_url, extension)
+        circuit = '{}/{}'.format(self.base_url, _endpoint(extension))
 
+        request_headers = self.headers
         if headers:
-            self.headers.update(headers)
+            request_headers = dict(self.headers)
+            request_headers.update(headers)
         if data:
             data = json.dumps({'data':data})
 
-        if self.delay > 0.0:
-            t = time.time()
-            if self._last_request_time is None:
-                self._last_request_time = t
-            elapsed = t - self._last_request_time
-            if elapsed < self.delay:
-                time.sleep(self.delay - elapsed)
-
-        request = self.session.request(method, url, params=params,
-                                headers=self.headers, data=data, verify=verify,
+        started = time.time()
+        attempt = 0
+        self._last_status.code = None
+        while True:
+            if self.circuit_breaker:
+                self.circuit_breaker.before_request(circuit)
+            request, exception = None, None
+            try:
+                if self.rate_limiter:
+                    self.rate_limiter.acquire(method, extension)
+                request = self.session.request(method, url, params=params,
+                                headers=request_headers, data=data, verify=verify,
                                 **kwargs)
-        self._last_request_time = time.time()
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                exception = exc
+            except Exception as exc:
+                # not retried, but the breaker must hear of it, else a
+                # half-open circuit never gets its trial slot back
+                if self.circuit_breaker:
+                    self.circuit_breaker.record(circuit, exception=exc)
+                raise
+            if self.circuit_breaker:
+                self.circuit_breaker.record(circuit, request, exception)
+            wait = None
+            if self.retry_policy:
+                wait = self.retry_policy.get_delay(method, attempt,
+                        time.time() - started, request, exception)
+            if wait is None:
+                break
+            attempt += 1
+            self.logger.warning('Retry %s of %s %s in %.2fs. Reason: %s', attempt,
+                    method, extension, wait, exception or request.status_code)
+            time.sleep(wait)
+
+        if exception is not None:
+            raise exception
+        self._last_status.code = request.status_code
         if not self.silent:
             request.raise_for_status()
             
         return request.json() if request.text else {}
+
+    def _send(self, *args, **kwargs):
+        """
+        `request()` under the concurrency limit. Bulk operations send their
+        requests through here, so that the limit adapts to how splunkd copes.
+        """
+        self.concurrency_limit.acquire()
+        started = time.time()
+        overloaded, failed = False, False
+        try:
+            self._last_status.code = None
+            rval = self.request(*args, **kwargs)
+            # silent clients return error responses instead of raising
+            overloaded = _is_overload_status(self._last_status.code)
+            return rval
+        except Exception as exc:
+            overloaded = _is_overload(exc)
+            failed = not overloaded
+            raise
+        finally:
+            self.concurrency_limit.release(time.time() - started, overloaded,
+                    failed)
+
+    def _dispatch(self, func, items):
+        """
+        call `func` on each item concurrently. Requests are expected to go
+        through `_send()`, which keeps the number in flight within the
+        concurrency limit.
+
+        @type func: callable
+        @param func: takes one item
+
+        @type items: list
+        @param items: items to work on
+
+        @rtype: list
+        @return: list of tuples (result, exception) in the order of `items`.
+            One of the two is always None.
+        """
+        def call(item):
+            try:
+                return func(item), None
+            except Exception as exc:
+                return None, exc
+
+        if len(items) < 2:
+            return [call(i) for i in items]
+        pool = ThreadPool(min(len(items), self.concurrency_limit.max_limit))
+        try:
+            return pool.map(call, items, 1)
+        finally:
+            pool.close()
+            pool.join()
@@ -1,9 +1,19 @@
+import os
 import mock
+import gzip
+import tempfile
+import time
+import threading
 import unittest
 import json
+import urllib
 import requests
 from fixtures import *
 from itsi_event_management_sdk import Event, EventMeta, EventGroup, Client
+from itsi_event_management_sdk import RateLimiter, TokenBucket, RetryPolicy
+from itsi_event_management_sdk import CircuitBreaker, CircuitOpenError, AdaptiveConcurrencyLimit
+from itsi_event_management_sdk import EventCache, CustomEventActionBase
+from itsi_event_management_sdk import AsyncEvent, AsyncEventMeta, AsyncEventGroup, gather
 
 
 class TestEventMeta(unittest.TestCase):
@@ -37,6 +47,74 @@ class TestEvent(unittest.TestCase):
                 params={'ids': '["e28f6a23-e447-11e7-bf0b-acbc32b4d98f"]'})
 
 
+    @mock.patch('time.sleep')
+    @mock.patch('itsi_event_management_sdk.Event.request')
+    def test_001_test_poll_index(self, request, sleep):
+        other = dict(GET_FROM_INDEX[0], event_id='e2', _key='e2')
+        request.side_effect = [[other], [], GET_FROM_INDEX]
+        a = Event('admin', 'qwqwqw',
+                  'https://localhost:8089/servicesNS/nobody/SA-ITOA')
+        self.assertEqual(a._poll_index(['e28f6a23-e447-11e7-bf0b-acbc32b4d98f', 'e2'],
+                                       earliest_time='-1d', foo='bar'),
+                         (GET_FROM_INDEX + [other], []))
+        self.assertEqual(request.call_args_list[1], mock.call('GET',
+                'event_management_interface/notable_event',
+                params={'earliest_time': '-1d',
+                        'ids': '["e28f6a23-e447-11e7-bf0b-acbc32b4d98f"]'}))
+        self.assertEqual([c[0][0] for c in sleep.call_args_list], [0.5, 1.0])
+
+        request.side_effect = None
+        request.return_value = []
+        self.assertEqual(a._poll_index(['e3'], poll_timeout=2.0), ([], ['e3']))
+        self.assertEqual(a._get_from_index('e3', poll_timeout=0), None)
+
+    @mock.patch('itsi_event_management_sdk.Event.request')
+    def test_001_test_get_from_index_chunks(self, request):
+        def lookup(method, extension, params):
+            ids = json.loads(params['ids'])
+            self.assertTrue(len(urllib.quote(params['ids'])) <= 200)
+            return [{'event_id': i, '_key': i} for i in ids if i != 'id-7']
+        request.side_effect = lookup
+        a = Event('admin', 'qwqwqw',
+                  'https://localhost:8089/servicesNS/nobody/SA-ITOA')
+        a.POLL_TIMEOUT = 0
+        a.MAX_LOOKUP_BYTES = 200
+        ids = ['id-%s' % i for i in range(50, 0, -1)] + ['id-3']
+        self.assertEqual([i['event_id'] for i in a._get_from_index(ids)],
+                         [i for i in ids[:-1] if i != 'id-7'])
+        self.assertTrue(request.call_count > 1)
+        self.assertEqual(a._chunk_ids(['a' * 300, 'b'], 200), [['a' * 300], ['b']])
+
+        missing = []
+        self.assertEqual(a.get_fields(event_ids=['id-8', 'id-7', 'id-6'],
+                                      fields='severity', missing=missing).keys(),
+                         ['id-8', 'id-6'])
+        self.assertEqual(missing, ['id-7'])
+        self.assertRaises(TypeError, a._get_from_index, ['id-7'], missing='id-7')
+
+    @mock.patch('itsi_event_management_sdk.Event.request')
+    def test_001_test_iter_events(self, request):
+        def page(method, extension, params):
+            return [{'event_id': str(i)} for i in
+                    range(params['offset'], min(params['offset'] + params['count'], 7))]
+        request.side_effect = page
+        a = Event('admin', 'qwqwqw',
+                  'https://localhost:8089/servicesNS/nobody/SA-ITOA')
+        events = a.iter_events({'status': '1'}, earliest_time='-24h',
+                               fields=['event_id', 'status'], page_size=3)
+        self.assertFalse(request.called)
+        self.assertEqual([i['event_id'] for i in events], map(str, range(7)))
+        self.assertEqual(request.call_args_list[-1], mock.call('GET',
+                'event_management_interface/notable_event',
+                params={'filter_data': '{"status": "1"}', 'earliest_time': '-24h',
+                        'fields': 'event_id,status', 'count': 3, 'offset': 6}))
+        self.assertEqual(request.call_count, 3)
+
+        request.reset_mock()
+        self.assertEqual(len(list(a.iter_events(page_size=3, limit=4))), 4)
+        self.assertEqual(request.call_count, 2)
+        self.assertRaises(ValueError, a.iter_events, page_size=0)
+
     @mock.patch('itsi_event_management_sdk.Event.request')
     def test_002_test_get_severity(self, request):
         request.return_value = self.get_from_index_return_value
@@ -85,6 +163,28 @@ class TestEvent(unittest.TestCase):
                 params={'earliest_time': '-1d', 'latest_time': '-1s',
                     'ids': '["e28f6a23-e447-11e7-bf0b-acbc32b4d98f"]'})
 
+    @mock.patch('itsi_event_management_sdk.Event.request')
+    def test_004_test_get_fields(self, request):
+        request.return_value = self.get_from_index_return_value
+        a = Event('admin', 'qwqwqw',
+                  'https://localhost:8089/servicesNS/nobody/SA-ITOA')
+        id_ = 'e28f6a23-e447-11e7-bf0b-acbc32b4d98f'
+        self.assertEqual(a.get_fields(event_ids=id_,
+                                      fields=['severity', 'status', 'owner', 'nope']),
+            {id_: {'severity': u'low', 'status': u'new', 'owner': u'admin',
+                   'nope': None}})
+        self.assertEqual(request.call_count, 1)
+
+        # pairing survives duplicate values and keeps the order of events
+        events = [{'event_id': 'c', 'severity': '2'},
+                  {'event_id': 'a', 'severity': '2'},
+                  {'event_id': 'b', 'severity': '5'}]
+        self.assertEqual(a.get_severity(events=events),
+                         [('c', '2'), ('a', '2'), ('b', '5')])
+        self.assertEqual(a.get_fields(events=events, fields='severity').keys(),
+                         ['c', 'a', 'b'])
+        self.assertRaises(TypeError, a.get_fields, events=events, fields=None)
+
     @mock.patch('itsi_event_management_sdk.Event.request')
     def test_005_test_update(self, request):
         request.return_value = UPDATE_BLOB
@@ -109,6 +209,29 @@ class TestEvent(unittest.TestCase):
                'event_id': '031f06c0-e453-11e7-b054-acbc32b4d98f',
                'severity': 'high'}], params={})
 
+    @mock.patch('itsi_event_management_sdk.Event.request')
+    def test_005_test_update_groups(self, request):
+        request.side_effect = lambda method, extension, params, data: [
+                i['event_id'] for i in data]
+        a = Event('admin', 'qwqwqw',
+                  'https://localhost:8089/servicesNS/nobody/SA-ITOA')
+        blob = [{'event_ids': ['e%d' % i, 'e%d' % (i + 1)], 'owner': 'admin'}
+                for i in range(0, 10, 2)]
+        blob.append({'event_ids': 'e1,e2', 'status': 'closed', 'owner': 'foo'})
+        blob.append({'event_ids': ['e2'], 'status': 'new'})
+        self.assertEqual(sorted(a.update(blob, chunk_size=4)), ['e%d' % i for i in range(10)])
+        self.assertEqual(request.call_count, 3)
+        # chunks go out concurrently, in no particular order
+        chunks = [c[1]['data'] for c in request.call_args_list]
+        sent = [r for c in chunks for r in c]
+        self.assertTrue([{'owner': 'admin', 'event_id': i}
+                         for i in ('e0', 'e3', 'e4', 'e5')] in chunks)
+        self.assertTrue({'owner': 'foo', 'status': 'closed', 'event_id': 'e1'} in sent)
+        self.assertTrue({'owner': 'foo', 'status': 'new', 'event_id': 'e2'} in sent)
+        self.assertEqual(len(sent), 10)
+        self.assertEqual(a.concurrency_limit.in_flight, 0)
+        self.assertEqual(blob[-1], {'event_ids': ['e2'], 'status': 'new'})
+
     @mock.patch('itsi_event_management_sdk.Event.request')
     def test_006_test_update_severity(self, request):
         a = Event('admin', 'qwqwqw',
@@ -135,6 +258,105 @@ class TestEvent(unittest.TestCase):
                                           'event_id': '031f06c0-e453-11e7-b054-acbc32b4d98f'}],
                                    params={})
 
+    @mock.patch('itsi_event_management_sdk.Event.request')
+    def test_007_test_update_status_chunks(self, request):
+        def put(method, extension, params, data):
+            if any(i['event_id'] == 'e3' for i in data):
+                raise requests.HTTPError('503 Server Error')
+            return [i['event_id'] for i in data]
+        request.side_effect = put
+        a = Event('admin', 'qwqwqw',
+                  'https://localhost:8089/servicesNS/nobody/SA-ITOA')
+        rval = a.update_status(['e%d' % i for i in range(5)], 'closed', chunk_size=2,
+                               earliest_time='-1d')
+        self.assertEqual(request.call_count, 3)
+        request.assert_any_call('PUT', 'event_management_interface/notable_event',
+                params={'earliest_time': '-1d'},
+                data=[{'status': 'closed', 'event_id': 'e4'}])
+        self.assertEqual(rval['succeeded'], ['e0', 'e1', 'e4'])
+        self.assertEqual(rval['failed'], {'e2': '503 Server Error', 'e3': '503 Server Error'})
+        self.assertEqual([c['event_ids'] for c in rval['chunks']],
+                         [['e0', 'e1'], ['e2', 'e3'], ['e4']])
+        self.assertEqual(rval['chunks'][0]['response'], ['e0', 'e1'])
+
+    @mock.patch('itsi_event_management_sdk.Event.request')
+    def test_007_test_skip_unchanged(self, request):
+        a = Event('admin', 'qwqwqw',
+                  'https://localhost:8089/servicesNS/nobody/SA-ITOA')
+        rows = [{'event_id': 'e1', 'status': '5', 'owner': 'admin'},
+                {'event_id': 'e2', 'status': '1', 'owner': 'admin'}]
+        rval = a.update_status('e1,e2,e3', '5', known_state=rows)
+        self.assertEqual(rval['skipped'], ['e1'])
+        request.assert_called_once_with('PUT', 'event_management_interface/notable_event',
+                params={}, data=[{'status': '5', 'event_id': 'e2'},
+                                 {'status': '5', 'event_id': 'e3'}])
+        request.reset_mock()
+        skipped = []
+        a.update({'event_ids': ['e1', 'e2'], 'owner': 'admin', 'status': '5'},
+                 known_state=rows, skipped=skipped)
+        request.assert_called_once_with('PUT', 'event_management_interface/notable_event',
+                params={}, data=[{'owner': 'admin', 'status': '5', 'event_id': 'e2'}])
+        self.assertEqual(skipped, ['e1'])
+        self.assertRaises(TypeError, a.update, {'event_ids': 'e1', 'status': '5'},
+                          skipped=set())
+
+    @mock.patch('itsi_event_management_sdk.Event.request')
+    def test_007_test_skip_unchanged_prefetch(self, request):
+        request.return_value = GET_FROM_INDEX
+        a = Event('admin', 'qwqwqw',
+                  'https://localhost:8089/servicesNS/nobody/SA-ITOA')
+        rval = a.update_owner(['e28f6a23-e447-11e7-bf0b-acbc32b4d98f'], 'admin',
+                              known_state=True)
+        self.assertEqual(rval['skipped'], ['e28f6a23-e447-11e7-bf0b-acbc32b4d98f'])
+        self.assertEqual(rval['chunks'], [])
+        request.assert_called_once_with('GET', 'event_management_interface/notable_event',
+                params={'ids': '["e28f6a23-e447-11e7-bf0b-acbc32b4d98f"]'})
+
+        # events missing from the index are not waited for
+        request.reset_mock()
+        request.return_value = []
+        with mock.patch('time.sleep') as sleep:
+            rval = a.update_status(['not-in-index'], '5', known_state=True,
+                                   earliest_time='-1d', poll_timeout=10)
+        self.assertEqual(rval['succeeded'], ['not-in-index'])
+        self.assertFalse(sleep.called)
+        self.assertEqual(request.call_count, 2)
+        request.assert_called_with('PUT', 'event_management_interface/notable_event',
+                params={'earliest_time': '-1d'},
+                data=[{'status': '5', 'event_id': 'not-in-index'}])
+
+    def test_007_test_chunk_by_bytes(self):
+        a = Event('admin', 'qwqwqw',
+                  'https://localhost:8089/servicesNS/nobody/SA-ITOA')
+        records = [{'event_id': 'e%d' % i, 'owner': 'x' * 100} for i in range(4)]
+        self.assertEqual(len(a._chunk(records, chunk_size=10, max_chunk_bytes=300)), 2)
+        self.assertEqual(len(a._chunk(records, chunk_size=10, max_chunk_bytes=10)), 4)
+        self.assertRaises(ValueError, a._chunk, records, chunk_size=0)
+
+    @mock.patch('itsi_event_management_sdk.Event.request')
+    def test_007_test_batch(self, request):
+        request.side_effect = lambda method, extension, params, data: [
+                i['event_id'] for i in data]
+        a = Event('admin', 'qwqwqw',
+                  'https://localhost:8089/servicesNS/nobody/SA-ITOA')
+        with a.batch(max_events=3, earliest_time='-1d') as batch:
+            batch.update_status('e1,e2', 'new')
+            batch.update_owner(['e1'], 'admin')
+            batch.update_status(['e1'], 'closed')
+            self.assertFalse(request.called)
+            batch.update_severity('e3', 'high')
+            self.assertEqual(request.call_count, 1)
+            request.assert_called_with('PUT', 'event_management_interface/notable_event',
+                    params={'earliest_time': '-1d'},
+                    data=[{'status': 'closed', 'owner': 'admin', 'event_id': 'e1'},
+                          {'status': 'new', 'event_id': 'e2'},
+                          {'severity': 'high', 'event_id': 'e3'}])
+            batch.update_owner('e4', 'admin')
+            self.assertRaises(ValueError, batch.update_owner, 'e4', ' ')
+        self.assertEqual(request.call_count, 2)
+        self.assertEqual([r['succeeded'] for r in batch.results], [['e1', 'e2', 'e3'], ['e4']])
+        self.assertEqual(batch.flush(), None)
+
     @mock.patch('itsi_event_management_sdk.Event.request')
     def test_008_test_create_tag(self, request):
         request.return_value = CREATE_TAG
@@ -170,6 +392,23 @@ class TestEvent(unittest.TestCase):
                                    'event_management_interface/notable_event_tag/e28f6a23-e447-11e7-bf0b-acbc32b4d98f',
                                     params={'is_event_id': True})
 
+    @mock.patch('itsi_event_management_sdk.Event.request')
+    def test_010_test_get_tags_for_events(self, request):
+        def get(method, extension, params):
+            if extension.endswith('/e2'):
+                raise requests.HTTPError('404')
+            return GET_ALL_TAGS
+        request.side_effect = get
+        a = Event('admin','qwqwqw',
+                  'https://localhost:8089/servicesNS/nobody/SA-ITOA')
+        rval = a.get_tags_for_events('e3,e2,e1,e3')
+        self.assertEqual(rval.keys(), ['e3', 'e2', 'e1'])
+        self.assertEqual(rval['e1'], GET_ALL_TAGS)
+        self.assertEqual(rval['e1'][0]['_key'], u'5a4c14fb9693fb9dbf20acc1')
+        self.assertEqual(rval['e2'], None)
+        self.assertEqual(request.call_count, 3)
+        self.assertRaises(TypeError, a.get_tags_for_events, [])
+
     @mock.patch('itsi_event_management_sdk.Event.request')
     def test_011_test_get_tag(self, request):
         a = Event('admin','qwqwqw',
@@ -195,6 +434,130 @@ class TestEvent(unittest.TestCase):
                 'event_management_interface/notable_event_tag/e28f6a23-e447-11e7-bf0b-acbc32b4d98f',
                 params={'is_event_id': True})
 
+    @mock.patch('itsi_event_management_sdk.Event.request')
+    def test_013_test_delete_all_tags_for_events(self, request):
+        def delete(method, extension, params):
+            if extension.endswith('/e2'):
+                raise requests.HTTPError('503')
+            return {}
+        request.side_effect = delete
+        a = Event('admin', 'qwqwqw',
+                  'https://localhost:8089/servicesNS/nobody/SA-ITOA')
+        checkpoint = tempfile.mktemp()
+        self.addCleanup(lambda: os.path.exists(checkpoint) and os.remove(checkpoint))
+        rval = a.delete_all_tags_for_events('e1,e2,e3', checkpoint=checkpoint)
+        self.assertEqual(rval, {'succeeded': ['e1', 'e3'], 'failed': {'e2': '503'},
+                                'skipped': []})
+        request.assert_any_call('DELETE', 'event_management_interface/notable_event_tag/e3',
+                                params={'is_event_id': True})
+
+        # resuming only retries what did not go through
+        request.side_effect = None
+        rval = a.delete_all_tags_for_events(['e1', 'e2', 'e3'], checkpoint=checkpoint)
+        self.assertEqual(rval, {'succeeded': ['e2'], 'failed': {}, 'skipped': ['e1', 'e3']})
+        self.assertEqual(request.call_count, 4)
+        with open(checkpoint) as f:
+            self.assertEqual(sorted(f.read().splitlines()[1:]), ['e1', 'e2', 'e3'])
+
+        # a checkpoint is only good for the operation that wrote it
+        self.assertRaises(ValueError, a.delete_all_comments_for_events, 'e1',
+                          checkpoint=checkpoint)
+        os.remove(checkpoint)
+        a.delete_ticket_info('e1', 'snow', 'INC1', checkpoint=checkpoint)
+        self.assertRaises(ValueError, a.delete_ticket_info, 'e1', 'snow', 'INC2',
+                          checkpoint=checkpoint)
+        self.assertEqual(a.delete_ticket_info('e1', 'snow', 'INC1',
+                                              checkpoint=checkpoint)['skipped'], ['e1'])
+
+    @mock.patch('itsi_event_management_sdk.Event.request')
+    def test_013_test_create_tags(self, request):
+        def send(method, extension, params=None, data=None):
+            if method == 'GET':
+                return GET_ALL_TAGS if extension.endswith('e28f6a23-e447-11e7-bf0b-acbc32b4d98f') else []
+            if data['tag_name'] == 'bad':
+                raise requests.HTTPError('500 Server Error')
+            return {'_key': '%s-%s' % (data['event_id'], data['tag_name'])}
+        request.side_effect = send
+        a = Event('admin', 'qwqwqw',
+                  'https://localhost:8089/servicesNS/nobody/SA-ITOA')
+        rval = a.create_tags(['test', 'remedy', 'remedy'],
+                             event_ids='e28f6a23-e447-11e7-bf0b-acbc32b4d98f,e2')
+        self.assertEqual(rval, {
+            'tags': {'e28f6a23-e447-11e7-bf0b-acbc32b4d98f': {
+                        'remedy': 'e28f6a23-e447-11e7-bf0b-acbc32b4d98f-remedy'},
+                     'e2': {'test': 'e2-test', 'remedy': 'e2-remedy'}},
+            'skipped': {'e28f6a23-e447-11e7-bf0b-acbc32b4d98f': ['test']},
+            'failed': {}})
+        rval = a.create_tags({'e3': ['bad', 'good']}, skip_existing=False)
+        self.assertEqual(rval['tags'], {'e3': {'good': 'e3-good'}})
+        self.assertEqual(rval['failed'], {'e3': {'bad': '500 Server Error'}})
+        self.assertRaises(ValueError, a.create_tags, {'e3': 'x'}, event_ids=['e4'])
+        self.assertRaises(ValueError, a.create_tags, [''], event_ids=['e4'])
+
+    @mock.patch('itsi_event_management_sdk.Event.request')
+    def test_013_test_delete_tags(self, request):
+        request.side_effect = lambda method, extension, params=None: \
+                GET_ALL_TAGS if method == 'GET' else {}
+        a = Event('admin', 'qwqwqw',
+                  'https://localhost:8089/servicesNS/nobody/SA-ITOA')
+        rval = a.delete_tags({'e28f6a23-e447-11e7-bf0b-acbc32b4d98f': ['test', 'other']})
+        self.assertEqual(rval, {
+            'tags': {'e28f6a23-e447-11e7-bf0b-acbc32b4d98f': {'test': '5a4c14fb9693fb9dbf20acc1'}},
+            'skipped': {'e28f6a23-e447-11e7-bf0b-acbc32b4d98f': ['other']},
+            'failed': {}})
+        request.assert_called_with('DELETE',
+                'event_management_interface/notable_event_tag/5a4c14fb9693fb9dbf20acc1')
+
+        request.side_effect = requests.HTTPError('503')
+        rval = a.delete_tags({'e1': [], 'e2': ['test']})
+        self.assertEqual(rval['failed'], {'e1': {None: '503'}, 'e2': {'test': '503'}})
+        self.assertEqual(a.create_tags({'e1': []})['failed'], {'e1': {None: '503'}})
+
+    @mock.patch('itsi_event_management_sdk.Event.request')
+    def test_013_test_set_tags(self, request):
+        current = [
+            {'tag_name': 'keep', '_key': 'k1'},
+            {'tag_name': 'keep', '_key': 'k2'},
+            {'tag_name': 'stale', '_key': 'k3'},
+            {'tag_name': 'stale', '_key': 'k4'},
+            {'tag_name': 'fresh', '_key': 'k5'}]
+        def send(method, extension, params=None, data=None):
+            if method == 'GET':
+                return current
+            if method == 'POST':
+                return {'_key': 'new-%s' % data['tag_name']}
+            if extension.endswith('/k5'):
+                raise requests.HTTPError('503')
+            return {}
+        request.side_effect = send
+        a = Event('admin', 'qwqwqw',
+                  'https://localhost:8089/servicesNS/nobody/SA-ITOA')
+        rval = a.set_tags({'e1': ['keep', 'new']})
+        self.assertEqual(rval, {
+            'created': {'e1': {'new': 'new-new'}},
+            'deleted': {'e1': {'keep': ['k2'], 'stale': ['k3', 'k4']}},
+            'failed': {},
+            'delete_failed': {'e1': {'k5': '503'}}})
+        self.assertEqual(request.call_count, 6)
+
+        # failed deletes of copies of one tag name are all reported, apart
+        # from failed creates
+        current[:] = [{'tag_name': 'stale', '_key': 'k6'},
+                      {'tag_name': 'stale', '_key': 'k7'}]
+        def fail(method, extension, params=None, data=None):
+            if method == 'GET':
+                return current
+            raise requests.HTTPError('503')
+        request.side_effect = fail
+        rval = a.set_tags({'e1': ['stale2']})
+        self.assertEqual(rval['failed'], {'e1': {'stale2': '503'}})
+        self.assertEqual(rval['delete_failed'], {'e1': {'k6': '503', 'k7': '503'}})
+        self.assertEqual(rval['deleted'], {})
+
+        request.side_effect = requests.HTTPError('503')
+        rval = a.set_tags({'e1': []})
+        self.assertEqual(rval['failed'], {'e1': {None: '503'}})
+
     @mock.patch('itsi_event_management_sdk.Event.request')
     def test_014_test_create_comment(self, request):
         request.return_value = CREATE_COMMENT
@@ -209,6 +572,28 @@ class TestEvent(unittest.TestCase):
                                    data={'event_id': 'e28f6a23-e447-11e7-bf0b-acbc32b4d98f',
                                          'comment': 'test'})
 
+    @mock.patch('itsi_event_management_sdk.Event.request')
+    def test_014_test_create_comments(self, request):
+        def send(method, extension, data):
+            if data['event_id'] == 'e2':
+                raise requests.HTTPError('404 Client Error')
+            return {'_key': 'c-%s' % data['event_id']}
+        request.side_effect = send
+        a = Event('admin', 'qwqwqw',
+                  'https://localhost:8089/servicesNS/nobody/SA-ITOA')
+        with mock.patch.object(a, 'logger') as logger:
+            rval = a.create_comments('worklog', event_ids='e0,e1,e2,e3')
+            self.assertEqual(logger.error.call_count, 1)
+            self.assertFalse(logger.info.called)
+        self.assertEqual([i['comment_id'] for i in rval], ['c-e0', 'c-e1', None, 'c-e3'])
+        self.assertEqual(rval[2], {'event_id': 'e2', 'comment': 'worklog',
+                                   'comment_id': None, 'error': '404 Client Error'})
+        rval = a.create_comments([('e1', 'foo'), ('e0', 'bar')])
+        self.assertEqual(rval, [
+            {'event_id': 'e1', 'comment': 'foo', 'comment_id': 'c-e1', 'error': None},
+            {'event_id': 'e0', 'comment': 'bar', 'comment_id': 'c-e0', 'error': None}])
+        self.assertRaises(TypeError, a.create_comments, [('e1',)])
+
     @mock.patch('itsi_event_management_sdk.Event.request')
     def test_015_test_get_comment(self, request):
         request.return_value = GET_COMMENT
@@ -229,6 +614,17 @@ class TestEvent(unittest.TestCase):
                 'event_management_interface/notable_event_comment/e28f6a23-e447-11e7-bf0b-acbc32b4d98f',
                 params={'is_event_id': True})
 
+    @mock.patch('itsi_event_management_sdk.Event.request')
+    def test_015_test_get_comments_for_events(self, request):
+        request.return_value = GET_ALL_COMMENTS
+        a = Event('admin', 'qwqwqw',
+                  'https://localhost:8089/servicesNS/nobody/SA-ITOA')
+        rval = a.get_comments_for_events(['e1', 'e2'])
+        self.assertEqual(rval, {'e1': GET_ALL_COMMENTS, 'e2': GET_ALL_COMMENTS})
+        request.assert_any_call('GET',
+                'event_management_interface/notable_event_comment/e2',
+                params={'is_event_id': True})
+
     @mock.patch('itsi_event_management_sdk.Event.request')
     def test_015_test_delete_comment(self, request):
         a = Event('admin', 'qwqwqw',
@@ -264,7 +660,7 @@ class TestEvent(unittest.TestCase):
                   'https://localhost:8089/servicesNS/nobody/SA-ITOA')
         self.assertEqual(a.update_ticket_info(['e28f6a23-e447-11e7-bf0b-acbc32b4d98f'],
                               'test', "124", "http://google.com/"),
-                         {'failed': [], 'success': ['124']})
+                         {'failed': {}, 'succeeded': ['e28f6a23-e447-11e7-bf0b-acbc32b4d98f']})
         request.assert_called_with('PUT',
                 'event_management_interface/ticketing/e28f6a23-e447-11e7-bf0b-acbc32b4d98f',
                 data={'ticket_url': 'http://google.com/',
@@ -279,6 +675,46 @@ class TestEvent(unittest.TestCase):
         request.assert_called_with('DELETE', 
                 'event_management_interface/ticketing/e28f6a23-e447-11e7-bf0b-acbc32b4d98f/test/124')
 
+    @mock.patch('itsi_event_management_sdk.Event.request')
+    def test_015_test_ticket_info_per_id(self, request):
+        def send(method, extension, data=None):
+            if extension.endswith('/e2') or '/e2/' in extension:
+                raise requests.HTTPError('404 Client Error')
+            return {}
+        request.side_effect = send
+        a = Event('admin', 'qwqwqw',
+                  'https://localhost:8089/servicesNS/nobody/SA-ITOA')
+        expected = {'succeeded': ['e1', 'e3'], 'failed': {'e2': '404 Client Error'}}
+        self.assertEqual(a.update_ticket_info('e1,e2,e3,e1', 'snow', 'INC1', 'http://snow/INC1'),
+                         expected)
+        self.assertEqual(request.call_count, 3)
+        self.assertEqual(a.delete_ticket_info(['e1', 'e2', 'e3'], 'snow', 'INC1'),
+                         dict(expected, skipped=[]))
+        request.assert_any_call('DELETE', 'event_management_interface/ticketing/e3/snow/INC1')
+
+
+    @mock.patch('itsi_event_management_sdk.Event.request')
+    def test_016_test_cache(self, request):
+        request.return_value = [{'event_id': 'e1', 'status': '1', 'owner': 'admin'}]
+        a = Event('admin', 'qwqwqw',
+                  'https://localhost:8089/servicesNS/nobody/SA-ITOA', cache=EventCache())
+        self.assertEqual(a.get_status(event_ids='e1'), [('e1', '1')])
+        self.assertEqual(a.get_owner(event_ids='e1'), [('e1', 'admin')])
+        self.assertEqual(request.call_count, 1)
+        a.update_status('e1', '2')
+        self.assertEqual(a.get_status(event_ids='e1'), [('e1', '2')])
+        # already known to be in that state; nothing is sent
+        self.assertEqual(a.update_status('e1', '2', known_state=True)['skipped'], ['e1'])
+        self.assertEqual(request.call_count, 2)
+
+        # update() keeps the cache in line too
+        a.update({'event_ids': ['e1'], 'status': '5'})
+        self.assertEqual(a.get_status(event_ids='e1'), [('e1', '5')])
+        self.assertEqual(a.update_status('e1', '1', known_state=True)['succeeded'], ['e1'])
+        self.assertEqual(request.call_count, 4)
+        request.side_effect = requests.HTTPError('503')
+        self.assertRaises(requests.HTTPError, a.update, {'event_ids': 'e1', 'owner': 'x'})
+        self.assertEqual(a.cache.get('e1'), None)
 
 class TestEventGroup(unittest.TestCase):
     
@@ -445,5 +881,386 @@ class TestEventGroup(unittest.TestCase):
                                       ]
                                    })
 
+    @mock.patch('itsi_event_management_sdk.EventGroup.request')
+    def test_004_test_cache(self, request):
+        request.return_value = GET_GROUP
+        cache = EventCache()
+        a = EventGroup('admin', 'qwqwqw',
+                       'https://localhost:8089/servicesNS/nobody/SA-ITOA', cache=cache)
+        group_id = 'b1362b69-24f1-49bd-a2c4-cf57de6b7e2a'
+        self.assertEqual(a.get(group_id), GET_GROUP)
+        self.assertEqual(a.get(group_id), GET_GROUP)
+        self.assertEqual(request.call_count, 1)
+        # writes start from what splunkd has, not from the cached copy
+        request.return_value = dict(GET_GROUP, drilldown=[{'name': 'X', 'link': 'http://x'}])
+        a.add_drilldown(group_id, {'name': 'DrilldownName', 'link': 'http://drill.down'})
+        self.assertEqual(request.call_count, 3)
+        self.assertEqual(request.call_args[1]['data']['drilldown'],
+                         [{'name': 'X', 'link': 'http://x'},
+                          {'name': 'DrilldownName', 'link': 'http://drill.down'}])
+        self.assertEqual(len(cache), 0)
+
+class TestClient(unittest.TestCase):
+
+    def test_001_test_request_headers_not_shared(self):
+        a = Client('admin', 'qwqwqw',
+                   'https://localhost:8089/servicesNS/nobody/SA-ITOA', None)
+        with mock.patch.object(a.session, 'request') as request:
+            request.return_value.text = ''
+            a.request('GET', 'foo', headers={'X-Foo': 'bar'})
+            self.assertEqual(request.call_args[1]['headers'],
+                             {'Content-Type': 'application/json', 'X-Foo': 'bar'})
+            a.request('GET', 'foo')
+            self.assertEqual(request.call_args[1]['headers'],
+                             {'Content-Type': 'application/json'})
+        self.assertEqual(a.headers, {'Content-Type': 'application/json'})
+
+    def test_002_test_connection_pool(self):
+        a = Client('admin', 'qwqwqw',
+                   'https://localhost:8089/servicesNS/nobody/SA-ITOA', None,
+                   pool_maxsize=32, pool_block=True, keep_alive=False)
+        adapter = a.session.get_adapter('https://localhost:8089')
+        self.assertEqual(adapter._pool_maxsize, 32)
+        self.assertTrue(adapter._pool_block)
+        self.assertEqual(a.headers['Connection'], 'close')
+
+        # a shared session keeps its adapters
+        session = requests.Session()
+        adapter = session.get_adapter('https://localhost:8089')
+        with AsyncEvent(None, None, 'https://localhost:8089/servicesNS/nobody/SA-ITOA',
+                        session=session, max_workers=2):
+            pass
+        Client(None, None, 'https://localhost:8089/servicesNS/nobody/SA-ITOA', None,
+               session=session, pool_maxsize=64)
+        self.assertTrue(session.get_adapter('https://localhost:8089') is adapter)
+
+    @mock.patch('time.sleep')
+    def test_003_test_token_bucket(self, sleep):
+        bucket = TokenBucket(rate=10, burst=2)
+        self.assertEqual(bucket.acquire(), 0.0)
+        self.assertEqual(bucket.acquire(), 0.0)
+        self.assertAlmostEqual(bucket.acquire(), 0.1, places=2)
+        self.assertEqual(sleep.call_count, 1)
+
+    def test_004_test_rate_limiter_buckets(self):
+        limiter = RateLimiter(rate=50, buckets={
+            'PUT notable_event': (5, 2),
+            'notable_event_tag': TokenBucket(20)})
+        self.assertEqual(limiter.get_bucket('put', 'event_management_interface/notable_event').rate, 5)
+        self.assertEqual(limiter.get_bucket('GET', 'event_management_interface/notable_event').rate, 50)
+        self.assertEqual(limiter.get_bucket('DELETE',
+                'event_management_interface/notable_event_tag/5a394f449693fbcbf741b3e6').rate, 20)
+        self.assertEqual(RateLimiter().get_bucket('GET', 'foo'), None)
+
+    def test_005_test_rate_limiter_shared_by_session(self):
+        limiter = RateLimiter(rate=5)
+        a = Event('admin', 'qwqwqw',
+                  'https://localhost:8089/servicesNS/nobody/SA-ITOA', rate_limiter=limiter)
+        b = EventGroup(None, None, 'https://localhost:8089/servicesNS/nobody/SA-ITOA',
+                       session=a.session)
+        self.assertTrue(b.rate_limiter is limiter)
+        c = Event('admin', 'qwqwqw',
+                  'https://localhost:8089/servicesNS/nobody/SA-ITOA', delay=0.5)
+        self.assertEqual(c.rate_limiter.default.rate, 2.0)
+
+    def test_006_test_retry_policy(self):
+        policy = RetryPolicy(max_retries=2, backoff=1.0, total_timeout=10.0)
+        unavailable = mock.Mock(status_code=503, headers={})
+        throttled = mock.Mock(status_code=429, headers={'Retry-After': '7'})
+        self.assertEqual(policy.get_delay('POST', 0, 0.0, unavailable), None)
+        self.assertEqual(policy.get_delay('GET', 0, 0.0, mock.Mock(status_code=404)), None)
+        self.assertTrue(0.0 <= policy.get_delay('PUT', 1, 0.0, unavailable) <= 2.0)
+        self.assertEqual(policy.get_delay('GET', 0, 0.0, throttled), 7.0)
+        self.assertEqual(policy.get_delay('GET', 0, 5.0, throttled), None)
+        self.assertEqual(policy.get_delay('GET', 2, 0.0, unavailable), None)
+        self.assertTrue(policy.get_delay('DELETE', 0, 0.0,
+                exception=requests.ConnectionError()) is not None)
+
+    @mock.patch('time.sleep')
+    def test_007_test_request_retries(self, sleep):
+        a = Client('admin', 'qwqwqw',
+                   'https://localhost:8089/servicesNS/nobody/SA-ITOA', None,
+                   retry_policy=RetryPolicy(max_retries=3))
+        ok = mock.Mock(status_code=200, text='{"a": 1}')
+        ok.json.return_value = {'a': 1}
+        with mock.patch.object(a.session, 'request') as request:
+            request.side_effect = [requests.ConnectionError(),
+                                   mock.Mock(status_code=503, headers={}), ok]
+            self.assertEqual(a.request('GET', 'foo'), {'a': 1})
+            self.assertEqual(request.call_count, 3)
+            request.side_effect = requests.ConnectionError()
+            self.assertRaises(requests.ConnectionError, a.request, 'POST', 'foo')
+
+    @mock.patch('time.time')
+    def test_008_test_circuit_breaker(self, now):
+        now.return_value = 100.0
+        logger = mock.Mock()
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=10.0, logger=logger)
+        a = Client('admin', 'qwqwqw',
+                   'https://localhost:8089/servicesNS/nobody/SA-ITOA', None,
+                   circuit_breaker=breaker)
+        key = 'https://localhost:8089/servicesNS/nobody/SA-ITOA/event_management_interface/notable_event_tag'
+        with mock.patch.object(a.session, 'request') as request:
+            request.return_value = mock.Mock(status_code=503, text='')
+            for _ in range(2):
+                a.request('GET', 'event_management_interface/notable_event_tag/abc')
+            self.assertEqual(breaker.get_state(key), CircuitBreaker.OPEN)
+            self.assertRaises(CircuitOpenError, a.request, 'GET',
+                    'event_management_interface/notable_event_tag/def')
+            self.assertEqual(request.call_count, 2)
+            # other endpoints are not affected
+            a.request('GET', 'event_management_interface/notable_event_comment/abc')
+
+            now.return_value = 111.0
+            request.return_value = mock.Mock(status_code=200, text='')
+            a.request('GET', 'event_management_interface/notable_event_tag/abc')
+            self.assertEqual(breaker.get_state(key), CircuitBreaker.CLOSED)
+        self.assertEqual(logger.warning.call_count, 3)
+
+    @mock.patch('time.time')
+    def test_008_test_circuit_breaker_other_errors(self, now):
+        now.return_value = 100.0
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10.0)
+        a = Client('admin', 'qwqwqw',
+                   'https://localhost:8089/servicesNS/nobody/SA-ITOA', None,
+                   circuit_breaker=breaker)
+        key = 'https://localhost:8089/servicesNS/nobody/SA-ITOA/event_management_interface/notable_event_tag'
+        extension = 'event_management_interface/notable_event_tag/abc'
+        with mock.patch.object(a.session, 'request') as request:
+            request.side_effect = requests.exceptions.ChunkedEncodingError('eof')
+            self.assertRaises(requests.exceptions.ChunkedEncodingError,
+                              a.request, 'GET', extension)
+            self.assertEqual(breaker.get_state(key), CircuitBreaker.OPEN)
+            # the failed trial request frees its slot and opens the circuit again
+            now.return_value = 111.0
+            self.assertRaises(requests.exceptions.ChunkedEncodingError,
+                              a.request, 'GET', extension)
+            self.assertEqual(breaker.get_state(key), CircuitBreaker.OPEN)
+            now.return_value = 122.0
+            request.side_effect = None
+            request.return_value = mock.Mock(status_code=200, text='')
+            a.request('GET', extension)
+            self.assertEqual(breaker.get_state(key), CircuitBreaker.CLOSED)
+
+    @mock.patch('time.time')
+    def test_008_test_circuit_breaker_late_success(self, now):
+        now.return_value = 100.0
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=10.0)
+        key = 'https://localhost:8089/servicesNS/nobody/SA-ITOA/event_management_interface/notable_event'
+        ok = mock.Mock(status_code=200)
+        # three requests in flight, two fail and open the circuit
+        for _ in range(3):
+            breaker.before_request(key)
+        breaker.record(key, exception=requests.Timeout())
+        breaker.record(key, exception=requests.Timeout())
+        self.assertEqual(breaker.get_state(key), CircuitBreaker.OPEN)
+        # the slow one coming back fine does not close it
+        breaker.record(key, ok)
+        self.assertEqual(breaker.get_state(key), CircuitBreaker.OPEN)
+        self.assertRaises(CircuitOpenError, breaker.before_request, key)
+        now.return_value = 111.0
+        breaker.before_request(key)
+        breaker.record(key, ok)
+        self.assertEqual(breaker.get_state(key), CircuitBreaker.CLOSED)
+
+    def test_009_test_adaptive_concurrency_limit(self):
+        changes = []
+        limit = AdaptiveConcurrencyLimit(initial=2, max_limit=4, on_change=changes.append)
+        for _ in range(10):
+            limit.acquire()
+            limit.release(0.1)
+        self.assertEqual(limit.limit, 4)
+        # slow requests hold the limit where it is
+        limit.acquire()
+        limit.release(10.0)
+        self.assertEqual(limit.limit, 4)
+        limit.acquire()
+        limit.release(0.1, overloaded=True)
+        self.assertEqual(limit.limit, 2)
+        self.assertEqual(changes, [3, 4, 2])
+        self.assertEqual(limit.in_flight, 0)
+
+    def test_009_test_send_overload(self):
+        limit = AdaptiveConcurrencyLimit(initial=4, max_limit=8)
+        a = Client('admin', 'qwqwqw',
+                   'https://localhost:8089/servicesNS/nobody/SA-ITOA', None,
+                   silent=True, concurrency_limit=limit)
+        with mock.patch.object(a.session, 'request') as request:
+            # a silent client returns the 503 instead of raising it
+            request.return_value = mock.Mock(status_code=503, text='')
+            a._send('GET', 'event_management_interface/notable_event')
+            self.assertEqual(limit.limit, 2)
+            # failures that are not overload leave the limit alone
+            request.return_value = mock.Mock(status_code=200, text='x')
+            request.return_value.json.side_effect = ValueError('No JSON')
+            for _ in range(10):
+                self.assertRaises(ValueError, a._send, 'GET',
+                                  'event_management_interface/notable_event')
+            self.assertEqual(limit.limit, 2)
+            self.assertEqual(limit.in_flight, 0)
+
+    def test_010_test_dispatch(self):
+        a = Client('admin', 'qwqwqw',
+                   'https://localhost:8089/servicesNS/nobody/SA-ITOA', None)
+        def func(i):
+            if i == 3:
+                raise ValueError(i)
+            return i * 2
+        results = a._dispatch(func, range(6))
+        self.assertEqual([r for r, _ in results], [0, 2, 4, None, 8, 10])
+        self.assertTrue(isinstance(results[3][1], ValueError))
+
+
+    @mock.patch('time.time')
+    def test_011_test_event_cache(self, now):
+        now.return_value = 100.0
+        cache = EventCache(max_size=2, ttl=10)
+        cache.set('a', {'status': '1'})
+        cache.set('b', {'status': '1'})
+        cached = cache.get('a')
+        cached['status'] = '5'
+        self.assertEqual(cache.get('a'), {'status': '1'})
+        # `b` is the least recently used one
+        cache.set('c', {'status': '1'})
+        self.assertEqual(cache.get('b'), None)
+        cache.update('c', {'status': '2'})
+        self.assertEqual(cache.get_many(['a', 'c', 'd']),
+                         {'a': {'status': '1'}, 'c': {'status': '2'}})
+        now.return_value = 111.0
+        self.assertEqual(cache.get('a'), None)
+        self.assertEqual(cache.stats(), {'hits': 4, 'misses': 3,
+                                         'evictions': 1, 'size': 1})
+        self.assertRaises(ValueError, EventCache, max_size=0)
+
+class TestAsyncEvent(unittest.TestCase):
+
+    @mock.patch('itsi_event_management_sdk.Client.request')
+    def test_001_test_async_event_meta(self, request):
+        request.return_value = EVENT_META
+        with AsyncEventMeta('admin', 'qwqwqw',
+                'https://localhost:8089/servicesNS/nobody/SA-ITOA') as a:
+            self.assertEqual(a.get_all_statuses().get(), EVENT_META.get('statuses'))
+        request.assert_called_with('GET', 'event_management_interface/notable_event_configuration/all_info')
+
+    @mock.patch('itsi_event_management_sdk.Event.request')
+    def test_002_test_async_create_tag(self, request):
+        request.return_value = CREATE_TAG
+        with AsyncEvent('admin', 'qwqwqw',
+                'https://localhost:8089/servicesNS/nobody/SA-ITOA', max_workers=4) as a:
+            pending = [a.create_tag(i, 'test') for i in ('e1', 'e2', 'e3')]
+            self.assertEqual(gather(pending), [
+                {'event_id': i, 'tag_name': 'test', 'tag_id': u'5a4c14fb9693fb9dbf20acc1'}
+                for i in ('e1', 'e2', 'e3')])
+        self.assertEqual(request.call_count, 3)
+
+    @mock.patch('itsi_event_management_sdk.Event.request')
+    def test_003_test_async_validation(self, request):
+        with AsyncEvent('admin', 'qwqwqw',
+                'https://localhost:8089/servicesNS/nobody/SA-ITOA') as a:
+            pending = a.update_status([], 'closed')
+            self.assertRaises(ValueError, pending.get)
+            self.assertTrue(isinstance(gather([pending], return_exceptions=True)[0],
+                    ValueError))
+        self.assertFalse(request.called)
+
+    @mock.patch('itsi_event_management_sdk.EventGroup.request')
+    def test_004_test_async_event_group_get(self, request):
+        request.return_value = GET_GROUP
+        with AsyncEventGroup('admin', 'qwqwqw',
+                'https://localhost:8089/servicesNS/nobody/SA-ITOA') as a:
+            self.assertEqual(a.get('b1362b69-24f1-49bd-a2c4-cf57de6b7e2a').get(), GET_GROUP)
+
+
+class TestCustomEventActionBase(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.results_file = tempfile.mkstemp(suffix='.csv.gz')
+        os.close(fd)
+        self.addCleanup(os.remove, self.results_file)
+        with gzip.open(self.results_file, 'wb') as f:
+            f.write('event_id,severity,_time,orig_raw\r\n'
+                    'e1,5,1514935547,"a, b"\r\n'
+                    'e2,2,1514935548,c\r\n'
+                    'e1,5,1514935549,d\r\n')
+        self.action = CustomEventActionBase({'results_file': self.results_file})
+
+    def test_001_test_get_rows(self):
+        rows = list(self.action.get_rows(['severity', 'event_id']))
+        self.assertEqual(rows, [('5', 'e1'), ('2', 'e2'), ('5', 'e1')])
+        self.assertEqual(rows[1].event_id, 'e2')
+        self.assertEqual(list(self.action.get_rows('orig_raw', row_type='tuple')),
+                         [('a, b',), ('c',), ('d',)])
+        self.assertEqual(list(self.action.get_rows())[0]._fields,
+                         ('event_id', 'severity', '_2', 'orig_raw'))
+        self.assertEqual(list(self.action.get_event())[0]['orig_raw'], 'a, b')
+        self.assertRaises(KeyError, list, self.action.get_rows(['nope']))
+        self.assertRaises(ValueError, list, self.action.get_rows([]))
+        self.assertRaises(ValueError, self.action.get_columns, ['event_id', 'event_id'])
+
+    def test_002_test_get_columns(self):
+        self.assertEqual(self.action.get_columns(['event_id', '_time']),
+                         {'event_id': ['e1', 'e2', 'e1'],
+                          '_time': ['1514935547', '1514935548', '1514935549']})
+        self.action.settings['results_file'] = self.results_file + '.nope'
+        self.assertRaises(IOError, self.action.get_columns)
+
+    def test_003_test_read_in_background(self):
+        self.assertEqual(list(self.action.get_event(background=True, batch_size=2)),
+                         list(self.action.get_event()))
+        self.assertEqual(list(self.action.get_rows(background=True, queue_size=1,
+                                                   batch_size=1)),
+                         list(self.action.get_rows()))
+        # stopping early stops the reader too
+        threads = threading.active_count()
+        rows = self.action.get_rows('event_id', background=True, batch_size=1,
+                                    queue_size=1)
+        self.assertEqual(next(rows), ('e1',))
+        rows.close()
+        self.assertEqual(threading.active_count(), threads)
+        self.assertRaises(KeyError, list, self.action.get_rows('nope', background=True))
+        self.assertRaises(ValueError, self.action.get_rows, background=True,
+                          batch_size=0)
+
+    def test_004_test_get_event_batches(self):
+        self.assertEqual(list(self.action.get_event_batches(2, event_ids_only=True)),
+                         [['e1', 'e2'], ['e1']])
+        self.assertEqual(list(self.action.get_event_batches(event_ids_only=True,
+                                                            dedupe_window=1)),
+                         [['e1', 'e2', 'e1']])
+        self.assertEqual(list(self.action.get_event_batches(event_ids_only=True,
+                                                            dedupe_window=2)),
+                         [['e1', 'e2']])
+        batches = list(self.action.get_event_batches(max_bytes=60))
+        self.assertEqual([[i['_time'] for i in b] for b in batches],
+                         [['1514935547'], ['1514935548'], ['1514935549']])
+        self.assertEqual(len(list(self.action.get_event_batches(max_bytes=200))), 1)
+        self.assertRaises(ValueError, self.action.get_event_batches, 0)
+
+    def test_005_test_run(self):
+        def handle(row):
+            if row['event_id'] == 'e2':
+                raise ValueError('bad event')
+            return row['_time']
+        for workers, ordered in ((1, True), (4, True), (4, False)):
+            rval = self.action.run(handle, max_workers=workers, ordered=ordered)
+            self.assertEqual(rval['items'], 3)
+            self.assertEqual(rval['succeeded'], 2)
+            self.assertEqual(rval['failed'], {1: 'ValueError: bad event'})
+            self.assertEqual(rval['results'], ['1514935547', None, '1514935549'])
+
+        # the first item completes last; results still line up with items
+        def slow_first(rows):
+            if rows[0]['event_id'] == 'e1' and rows[0]['_time'] == '1514935547':
+                time.sleep(0.05)
+            return [i['_time'] for i in rows]
+        rval = self.action.run(slow_first, batch_size=1, max_workers=3, ordered=False)
+        self.assertEqual(rval['results'], [['1514935547'], ['1514935548'],
+                                           ['1514935549']])
+
+        rval = self.action.run(len, batch_size=2, event_ids_only=True, pool='process',
+                               max_workers=2, dedupe_window=10)
+        self.assertEqual(rval['results'], [2])
+        self.assertRaises(ValueError, self.action.run, len, pool='fiber')
+
 if __name__ == '__main__':
     unittest.main()